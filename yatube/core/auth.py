@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def get_user(request):
+    """Как django.contrib.auth.get_user, но пользователь берётся из кеша.
+
+    Кеш сбрасывается при сохранении и удалении пользователя, см.
+    core.signals. Хеш пароля в сессии проверяется как обычно.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.load_backend(backend_path).get_user(user_id)
+        if user is None:
+            return AnonymousUser()
+        cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    ):
+        request.session.flush()
+        return AnonymousUser()
+    return user
@@ -0,0 +1,103 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+
+def measure(func, repeat, timer=time.perf_counter):
+    """Время выполнения func в миллисекундах: медиана и среднее.
+
+    С timer=time.process_time измеряется процессорное время.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = timer()
+        func()
+        timings.append((timer() - started) * 1000)
+    return {
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+    }
+
+
+def feed_urls():
+    """Адреса страниц постов по данным из текущей базы."""
+    post = Post.objects.select_related('author').first()
+    if post is None:
+        return {}
+    urls = {
+        'index': reverse('posts:index'),
+        'profile': reverse('posts:profile', args=(post.author.username,)),
+        'post_detail': reverse('posts:post_detail', args=(post.pk,)),
+    }
+    group = Group.objects.filter(posts__isnull=False).first()
+    if group is not None:
+        urls['group_list'] = reverse('posts:group_list', args=(group.slug,))
+    return urls
+
+
+class WSGIClient:
+    """Гоняет запросы через настоящий WSGI-обработчик.
+
+    В отличие от django.test.Client, сигналы начала и конца запроса
+    закрывают соединения с базой так же, как в боевом воркере.
+    """
+
+    def __init__(self):
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory()
+
+    def get(self, path, **headers):
+        # Адрес вне INTERNAL_IPS, чтобы не подключался debug_toolbar
+        environ = self.factory._base_environ(
+            PATH_INFO=path,
+            REQUEST_METHOD='GET',
+            REMOTE_ADDR='192.0.2.1',
+            **headers
+        )
+        response = self.handler(environ, lambda status, headers: None)
+        body = b''.join(response)
+        response.close()
+        return body
+
+
+def feed_contexts():
+    """Контексты шаблонов лент по данным из текущей базы.
+
+    Посты уже загружены, так что отрисовка не обращается к базе.
+    """
+    posts = Post.objects.select_related('author', 'group')
+    post = posts.first()
+    if post is None:
+        return {}
+    page = Paginator(posts, settings.POSTS_PER_PAGE).get_page(1)
+    page.object_list = list(page.object_list)
+    author = post.author
+    contexts = {
+        'posts/index.html': {'page_obj': page, 'index': True},
+        'posts/follow.html': {'page_obj': page, 'follow': True},
+        'posts/profile.html': {
+            'page_obj': page,
+            'author': author,
+            'post_num': page.paginator.count,
+        },
+    }
+    if post.group is not None:
+        contexts['posts/group_list.html'] = {
+            'page_obj': page,
+            'group': post.group,
+        }
+    return contexts
+
+
+def feed_request(user):
+    """GET-запрос к главной для контекстных процессоров шаблонов."""
+    request = RequestFactory().get(reverse('posts:index'))
+    request.user = user
+    return request
@@ -0,0 +1,171 @@
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.checks import Error, Warning, register
+from django.db import connections
+from django.utils.module_loading import import_string
+from posts.models import FollowCounter
+
+# Проверки запускаются командой manage.py check --deploy --tag performance
+# в профиле, который нужно проверить, например DJANGO_ENV=prod.
+PERFORMANCE = 'performance'
+
+# Кеши, не общие для воркеров
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# Библиотеки клиентов memcached, которых нет в requirements.txt
+CACHE_LIBRARIES = {
+    'django.core.cache.backends.memcached.PyLibMCCache': 'pylibmc',
+    'django.core.cache.backends.memcached.MemcachedCache': 'memcache',
+}
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+COMPRESSION_MIDDLEWARE = 'core.middleware.CompressionMiddleware'
+SYNC_EMAIL_BACKENDS = (
+    'django.core.mail.backends.smtp.EmailBackend',
+)
+
+
+@register(PERFORMANCE, deploy=True)
+def check_debug(app_configs, **kwargs):
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG включён: каждый SQL-запрос сохраняется в '
+            'connection.queries, и память процесса растёт с каждым '
+            'запросом.',
+            id='core.W001',
+        ))
+    if 'debug_toolbar' in settings.INSTALLED_APPS:
+        warnings.append(Warning(
+            'debug_toolbar установлен: он замедляет запуск воркера и '
+            'каждый ответ.',
+            hint='Подключайте его только в профиле dev.',
+            id='core.W002',
+        ))
+    return warnings
+
+
+@register(PERFORMANCE, deploy=True)
+def check_caches(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    library = CACHE_LIBRARIES.get(backend)
+    if library and not find_spec(library):
+        return [Error(
+            f'Для кеша {backend} не установлен модуль {library}: первый '
+            'же запрос к кешу упадёт.',
+            hint='pip install -r requirements-prod.txt',
+            id='core.E001',
+        )]
+    if backend not in LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Кеш по умолчанию {backend} у каждого процесса свой: лимиты '
+        'запросов, журнал графа подписок и ждущие записи комментарии не '
+        'видны другим воркерам, а прогрев кеша повторяется в каждом.',
+        hint='Используйте memcached или другой общий кеш.',
+        id='core.W003',
+    )]
+
+
+def _loaders(loaders):
+    for loader in loaders:
+        if isinstance(loader, (list, tuple)):
+            yield loader[0]
+        else:
+            yield loader
+
+
+@register(PERFORMANCE, deploy=True)
+def check_templates(app_configs, **kwargs):
+    warnings = []
+    for engine in settings.TEMPLATES:
+        if not engine['BACKEND'].endswith('.DjangoTemplates'):
+            continue
+        loaders = engine.get('OPTIONS', {}).get('loaders', [])
+        if CACHED_LOADER not in _loaders(loaders):
+            warnings.append(Warning(
+                'Шаблоны Django читаются и компилируются заново при '
+                'каждой отрисовке.',
+                hint=f'Оберните загрузчики в {CACHED_LOADER}.',
+                id='core.W004',
+            ))
+    return warnings
+
+
+@register(PERFORMANCE, deploy=True)
+def check_databases(app_configs, **kwargs):
+    return [
+        Warning(
+            f'База {alias}: CONN_MAX_AGE = 0, соединение открывается '
+            'заново в каждом запросе.',
+            hint='Задайте DB_CONN_MAX_AGE или DB_POOL_SIZE.',
+            id='core.W005',
+        )
+        for alias, database in settings.DATABASES.items()
+        if not database.get('CONN_MAX_AGE') and 'POOL' not in database
+    ]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_follow_counters(app_configs, **kwargs):
+    vendor = connections['default'].vendor
+    if vendor in FollowCounter.TRIGGER_VENDORS:
+        return []
+    return [Warning(
+        f'Для {vendor} нет триггеров счётчиков подписок: число '
+        'подписчиков считается запросами COUNT при каждом показе профиля.',
+        hint='Триггеры есть для '
+             f'{", ".join(FollowCounter.TRIGGER_VENDORS)} '
+             '(миграция posts 0013).',
+        id='core.W011',
+    )]
+
+
+@register(PERFORMANCE, deploy=True)
+def check_static(app_configs, **kwargs):
+    warnings = []
+    storage = import_string(settings.STATICFILES_STORAGE)
+    if not issubclass(storage, ManifestFilesMixin):
+        warnings.append(Warning(
+            'Статика без хешей в именах: браузеры не могут кешировать её '
+            'надолго.',
+            hint='core.storage.CompressedManifestStaticFilesStorage '
+                 'добавляет хеши и сжатые варианты.',
+            id='core.W006',
+        ))
+    if COMPRESSION_MIDDLEWARE not in settings.MIDDLEWARE:
+        warnings.append(Warning(
+            'Ответы не сжимаются.',
+            hint=f'Добавьте {COMPRESSION_MIDDLEWARE} в MIDDLEWARE.',
+            id='core.W007',
+        ))
+    return warnings
+
+
+@register(PERFORMANCE, deploy=True)
+def check_background_work(app_configs, **kwargs):
+    warnings = []
+    if settings.JOBS_ALWAYS_EAGER:
+        warnings.append(Warning(
+            'JOBS_ALWAYS_EAGER: фоновые задачи и письма выполняются в '
+            'запросе, который их поставил.',
+            hint='Запустите воркеры manage.py run_jobs.',
+            id='core.W008',
+        ))
+    if settings.EMAIL_BACKEND in SYNC_EMAIL_BACKENDS:
+        warnings.append(Warning(
+            'Письма отправляются прямо из запроса, и он ждёт почтовый '
+            'сервер.',
+            hint='Используйте jobs.mail.QueuedEmailBackend.',
+            id='core.W009',
+        ))
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        warnings.append(Warning(
+            'Сессия читается из базы в каждом запросе.',
+            hint='SESSION_STORE=cached_db кеширует сессии.',
+            id='core.W010',
+        ))
+    return warnings
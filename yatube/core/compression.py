@@ -0,0 +1,95 @@
+import gzip
+import io
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Типы, которые имеет смысл сжимать: картинки png/jpg уже сжаты
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml', '.html', '.map',
+)
+# Суффикс файла со сжатым вариантом для каждой кодировки
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Уровни сжатия: наилучший для того, что сжимается один раз и отдаётся
+# много раз (статика, кеш страниц), и быстрый для ответов на лету
+LEVELS = {
+    True: {'br': 11, 'gzip': 9},
+    False: {'br': 5, 'gzip': 6},
+}
+
+
+def compress(data, encoding, best=True):
+    """Сжимает data в кодировке 'br' или 'gzip'."""
+    level = LEVELS[best][encoding]
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime=0: одинаковые данные дают одинаковые байты. GzipFile, а не
+    # gzip.compress: у того параметр mtime появился только в Python 3.8
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        mode='wb', compresslevel=level, fileobj=buffer, mtime=0
+    ) as zfile:
+        zfile.write(data)
+    return buffer.getvalue()
+
+
+def compress_sequence(chunks, encoding):
+    """Сжимает поток, отправляя каждый кусок сразу, без буферизации."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=LEVELS[False]['br'])
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+        mode='wb',
+        compresslevel=LEVELS[False]['gzip'],
+        fileobj=buffer,
+        mtime=0,
+    ) as zfile:
+        for chunk in chunks:
+            zfile.write(chunk)
+            zfile.flush()
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def available_encodings():
+    """Кодировки в порядке предпочтения, доступные в этой установке."""
+    if brotli is None:
+        return ('gzip',)
+    return ('br', 'gzip')
+
+
+def accepted_encodings(accept_encoding):
+    """Кодировки из заголовка Accept-Encoding, кроме явно запрещённых q=0."""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        name, _, quality = params.partition('=')
+        if name.strip() == 'q':
+            try:
+                if float(quality) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(accept_encoding, encodings=None):
+    """Лучшая из encodings (по умолчанию доступных), которую примет клиент.
+
+    Возвращает None, если клиент не принимает ни одну из них.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in encodings or available_encodings():
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
@@ -0,0 +1,63 @@
+from django.db.backends.sqlite3 import base
+
+from ...pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с проверкой живости соединения и необязательным пулом.
+
+    CONN_HEALTH_CHECKS: перед первым запросом в каждом HTTP-запросе
+    переиспользуемое соединение проверяется и при необходимости
+    открывается заново.
+    POOL: {'MAX_SIZE': 4, 'TIMEOUT': 5, 'MAX_AGE': 300} - соединения
+    берутся из пула воркера и возвращаются в него вместо закрытия.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self._pool_created_at = None
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return None
+        return get_pool(self.alias, super().get_new_connection, options)
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        conn, self._pool_created_at = pool.checkout(conn_params)
+        return conn
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.checkin(self.connection, self._pool_created_at)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def is_usable(self):
+        # У SQLite в Django 2.2 is_usable() всегда True
+        try:
+            self.connection.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
+
+    def ensure_connection(self):
+        if (
+            self.connection is not None
+            and not self.health_check_done
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
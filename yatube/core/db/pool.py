@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Пул соединений одного воркера с ограничением размера.
+
+    Считает время ожидания свободного соединения, чтобы было видно,
+    хватает ли MAX_SIZE под нагрузку.
+    """
+
+    def __init__(self, connect, max_size=4, timeout=5, max_age=None):
+        if max_size < 1:
+            raise ImproperlyConfigured('POOL MAX_SIZE должен быть >= 1')
+        self.connect = connect
+        self.timeout = timeout
+        self.max_age = max_age
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.created = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def checkout(self, conn_params):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(
+                f'Нет свободного соединения за {self.timeout} с'
+            )
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        while True:
+            try:
+                conn, created_at = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if not self._expired(created_at):
+                return conn, created_at
+            conn.close()
+        try:
+            conn = self.connect(conn_params)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.created += 1
+        return conn, time.monotonic()
+
+    def checkin(self, conn, created_at):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._expired(created_at):
+                conn.close()
+            else:
+                self._idle.put((conn, created_at))
+        finally:
+            self._slots.release()
+
+    def _expired(self, created_at):
+        return (
+            self.max_age is not None
+            and time.monotonic() - created_at >= self.max_age
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'created': self.created,
+                'idle': self._idle.qsize(),
+                'timeouts': self.timeouts,
+                'avg_wait_ms': (
+                    self.total_wait / self.checkouts * 1000
+                    if self.checkouts else 0.0
+                ),
+                'max_wait_ms': self.max_wait * 1000,
+            }
+
+
+def get_pool(alias, connect, options):
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(
+                connect,
+                max_size=options.get('MAX_SIZE', 4),
+                timeout=options.get('TIMEOUT', 5),
+                max_age=options.get('MAX_AGE'),
+            )
+        return _pools[alias]
+
+
+def stats():
+    """Метрики всех пулов текущего процесса."""
+    with _pools_lock:
+        return {alias: pool.stats() for alias, pool in _pools.items()}
@@ -0,0 +1,80 @@
+import random
+import threading
+
+from django.conf import settings
+
+PRIMARY_DB = 'default'
+# Служебные таблицы: очередь задач, очередь писем, ключи миниатюр и
+# кеш в базе. Они всегда читаются и пишутся в основной базе, а запись
+# в них не считается записью пользователя и не закрепляет его за
+# основной базой
+PRIMARY_ONLY_MODELS = {
+    'jobs.job',
+    'jobs.outgoingemail',
+    'thumbnail.kvstore',
+    'django_cache.cacheentry',
+}
+
+_state = threading.local()
+
+
+def pin_to_primary():
+    """Направляет все чтения текущего запроса в основную базу."""
+    _state.pinned = True
+
+
+def forget_writes():
+    """Прошлые записи больше не направляют чтения в основную базу."""
+    _state.written = False
+
+
+def unpin():
+    _state.pinned = False
+    forget_writes()
+
+
+def reset_pin(sender, **kwargs):
+    # Состояние потока не переживает запрос: иначе запись вне цикла
+    # запросов закрепила бы поток за основной базой навсегда
+    unpin()
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False) or has_written()
+
+
+def has_written():
+    return getattr(_state, 'written', False)
+
+
+def _primary_only(model):
+    # У модели кеша в базе нет label_lower, только эти два поля
+    opts = model._meta
+    return f'{opts.app_label}.{opts.model_name}' in PRIMARY_ONLY_MODELS
+
+
+class PrimaryReplicaRouter:
+    """Чтение - из реплик, запись - в основную базу.
+
+    После записи поток закрепляется за основной базой, чтобы
+    тот же запрос (и следующие запросы автора, см.
+    core.middleware.PrimaryPinningMiddleware) видел свои изменения.
+    Закрепление сбрасывается в начале и в конце каждого запроса.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or is_pinned() or _primary_only(model):
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not _primary_only(model):
+            _state.written = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
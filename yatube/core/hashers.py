@@ -0,0 +1,134 @@
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def run_kdf(func, *args, **kwargs):
+    """Выполняет вычисление хеша в пуле PASSWORD_HASHING_THREADS.
+
+    scrypt и argon2 отпускают GIL, поэтому в пуле они идут параллельно
+    с обработкой других запросов, а размер пула ограничивает, сколько
+    хешей - и сколько памяти под них - считается одновременно при
+    всплеске входов. Без настройки хеш считается в текущем потоке.
+    """
+    global _executor
+    threads = settings.PASSWORD_HASHING_THREADS
+    if not threads:
+        return func(*args, **kwargs)
+    if _executor is None:
+        with _executor_lock:
+            # Первые запросы могут прийти в нескольких потоках сразу
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    threads, thread_name_prefix='password-hashing'
+                )
+    return _executor.submit(func, *args, **kwargs).result()
+
+
+class ScryptPasswordHasher(hashers.BasePasswordHasher):
+    """scrypt из hashlib с параметрами из PASSWORD_SCRYPT.
+
+    Формат хеша тот же, что у хешера scrypt в Django 4.0+.
+    """
+    algorithm = 'scrypt'
+    dklen = 64
+
+    @property
+    def params(self):
+        config = settings.PASSWORD_SCRYPT
+        return (
+            config['work_factor'], config['block_size'], config['parallelism']
+        )
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        default_n, default_r, default_p = self.params
+        n, r, p = n or default_n, r or default_r, p or default_p
+        hash_ = run_kdf(
+            hashlib.scrypt,
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            # Память scrypt - 128 * r * (n + p) байт, с запасом
+            maxmem=2 * 128 * r * (n + p),
+            dklen=self.dklen,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+    def decode(self, encoded):
+        algorithm, n, salt, r, p, hash_ = encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return {
+            'salt': salt, 'hash': hash_,
+            'n': int(n), 'r': int(r), 'p': int(p),
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password, decoded['salt'], decoded['n'], decoded['r'],
+            decoded['p'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return OrderedDict([
+            (_('algorithm'), self.algorithm),
+            (_('work factor'), decoded['n']),
+            (_('block size'), decoded['r']),
+            (_('parallelism'), decoded['p']),
+            (_('salt'), hashers.mask_hash(decoded['salt'])),
+            (_('hash'), hashers.mask_hash(decoded['hash'])),
+        ])
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (decoded['n'], decoded['r'], decoded['p']) != self.params
+
+    def harden_runtime(self, password, encoded):
+        # Время scrypt растёт линейно с n и r, но выровнять его с
+        # текущими параметрами, как для PBKDF2, слишком сложно: память
+        # и число проходов не сводятся к числу итераций. Как и в
+        # Argon2PasswordHasher Django, выравнивания нет.
+        pass
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 с параметрами из PASSWORD_ARGON2 и счётом в пуле.
+
+    Хеши совместимы с django.contrib.auth.hashers.Argon2PasswordHasher;
+    хеши с другими параметрами пересчитываются при входе.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2['time_cost']
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2['memory_cost']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2['parallelism']
+
+    def encode(self, password, salt):
+        return run_kdf(super().encode, password, salt)
+
+    def verify(self, password, encoded):
+        return run_kdf(super().verify, password, encoded)
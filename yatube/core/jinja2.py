@@ -0,0 +1,64 @@
+import logging
+
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment
+from markupsafe import Markup
+from posts.services import (is_following, mutual_followers,
+                            recommended_authors)
+
+from .phased import placeholder
+from .templatetags.pagination import is_ellipsis, page_window
+
+logger = logging.getLogger(__name__)
+
+
+def url(viewname, *args, **kwargs):
+    """Аналог тега {% url %}."""
+    return reverse(viewname, args=args, kwargs=kwargs)
+
+
+def date(value, arg=None):
+    """Аналог фильтра |date с переводом в локальное время."""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def thumbnail(file, geometry, **options):
+    """Аналог тега {% thumbnail %} из sorl: миниатюра или None."""
+    from sorl.thumbnail import get_thumbnail
+    from sorl.thumbnail.conf import settings as thumbnail_settings
+
+    if not file:
+        return None
+    try:
+        return get_thumbnail(file, geometry, **options)
+    except Exception:
+        if thumbnail_settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Thumbnail tag failed')
+        return None
+
+
+def phased(template_name, **values):
+    """Аналог тега {% phased %}: фрагмент для второго прохода."""
+    return Markup(placeholder('jinja2', template_name, values))
+
+
+def environment(**options):
+    """Окружение Jinja2 с помощниками шаблонов лент."""
+    env = Environment(**options)
+    env.globals.update({
+        'follows': is_following,
+        'mutual_followers': mutual_followers,
+        'page_window': page_window,
+        'phased': phased,
+        'recommended_authors': recommended_authors,
+        'static': static,
+        'thumbnail': thumbnail,
+        'url': url,
+    })
+    env.filters['date'] = date
+    env.tests['ellipsis'] = is_ellipsis
+    return env
@@ -0,0 +1,39 @@
+import time
+
+from core.benchmark import WSGIClient, feed_urls, measure
+from core.compression import available_encodings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает размер ответа и процессорное время на запрос для '
+        'страниц постов без сжатия, с gzip и с brotli.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        urls = feed_urls()
+        if not urls:
+            raise CommandError('В базе нет постов: нечего измерять.')
+        client = WSGIClient()
+        cache.clear()
+        for encoding in ('identity',) + available_encodings():
+            self.stdout.write(encoding)
+            for name, url in urls.items():
+                # Первый запрос заполняет кеш страниц (главная)
+                size = len(client.get(url, HTTP_ACCEPT_ENCODING=encoding))
+                timing = measure(
+                    lambda: client.get(url, HTTP_ACCEPT_ENCODING=encoding),
+                    options['requests'],
+                    timer=time.process_time,
+                )
+                self.stdout.write(
+                    f'  {name:12} {size:7} bytes, '
+                    f'median {timing["median"]:.3f} ms CPU'
+                )
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+
+from core.benchmark import WSGIClient, feed_urls, measure
+from core.db import pool
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку страниц постов при новом соединении на '
+        'каждый запрос, постоянных соединениях и пуле.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **options):
+        urls = feed_urls()
+        if not urls:
+            raise CommandError('В базе нет постов: нечего измерять.')
+        client = WSGIClient()
+        settings_dict = connections['default'].settings_dict
+        saved = dict(settings_dict)
+        modes = {
+            'CONN_MAX_AGE=0': {'CONN_MAX_AGE': 0},
+            'persistent': {'CONN_MAX_AGE': 600},
+            'pool': {'CONN_MAX_AGE': 0, 'POOL': {'MAX_SIZE': 2}},
+        }
+        results = {}
+        try:
+            for mode, overrides in modes.items():
+                connections['default'].close()
+                settings_dict.pop('POOL', None)
+                settings_dict.update(overrides)
+                results[mode] = {
+                    name: measure(
+                        lambda: self.request(client, url),
+                        options['requests'],
+                    )
+                    for name, url in urls.items()
+                }
+        finally:
+            connections['default'].close()
+            settings_dict.clear()
+            settings_dict.update(saved)
+        baseline = results['CONN_MAX_AGE=0']
+        for mode, timings in results.items():
+            self.stdout.write(mode)
+            for name, timing in timings.items():
+                saved_ms = baseline[name]['median'] - timing['median']
+                self.stdout.write(
+                    f'  {name:12} median {timing["median"]:.3f} ms, '
+                    f'saved {saved_ms:+.3f} ms'
+                )
+        self.stdout.write(f'pool: {pool.stats()}')
+
+    def request(self, client, url):
+        cache.clear()
+        client.get(url)
@@ -0,0 +1,57 @@
+import time
+
+from core.benchmark import measure
+from django.conf import settings
+from django.contrib.auth.hashers import (check_password, get_hasher,
+                                         make_password)
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+PASSWORD = 'correct horse battery staple'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает хешеры паролей: сколько входов в секунду выдерживает '
+        'одно ядро при проверке пароля каждым из них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20)
+
+    def handle(self, *args, **options):
+        for name, path in settings.PASSWORD_HASHER_CHOICES.items():
+            try:
+                get_hasher_by_path(path)
+            except ValueError as error:
+                self.stdout.write(f'{name:8} пропущен: {error}')
+                continue
+            with override_settings(PASSWORD_HASHERS=[path]):
+                encoded = make_password(PASSWORD)
+                cpu = measure(
+                    lambda: check_password(PASSWORD, encoded),
+                    options['logins'],
+                    timer=time.process_time,
+                )
+                wall = measure(
+                    lambda: check_password(PASSWORD, encoded),
+                    options['logins'],
+                )
+                summary = get_hasher().safe_summary(encoded)
+            params = ', '.join(
+                f'{key}={value}' for key, value in summary.items()
+                if key not in ('algorithm', 'salt', 'hash')
+            )
+            self.stdout.write(
+                f'{name:8} {1000 / cpu["median"]:8.1f} входов/с на ядро, '
+                f'проверка {wall["median"]:.1f} мс ({params})'
+            )
+
+
+def get_hasher_by_path(path):
+    """Хешер по пути класса; ValueError, если нет его библиотеки."""
+    with override_settings(PASSWORD_HASHERS=[path]):
+        hasher = get_hasher()
+        if hasher.library:
+            hasher._load_library()
+    return hasher
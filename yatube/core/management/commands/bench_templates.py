@@ -0,0 +1,103 @@
+import time
+
+from core.benchmark import feed_contexts, feed_request, measure
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.backends.django import DjangoTemplates
+from django.template.backends.jinja2 import Jinja2
+
+SOURCE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def django_engine(name, loaders, debug):
+    config = settings.TEMPLATES[0]
+    return DjangoTemplates({
+        'NAME': name,
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'context_processors': config['OPTIONS']['context_processors'],
+            'loaders': loaders,
+            'debug': debug,
+        },
+    })
+
+
+def jinja2_engine():
+    config = next(
+        config for config in settings.TEMPLATES
+        if config['BACKEND'] == 'django.template.backends.jinja2.Jinja2'
+    )
+    return Jinja2({
+        'NAME': config['NAME'],
+        'DIRS': config['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': {**config['OPTIONS'], 'auto_reload': False},
+    })
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает процессорное время отрисовки шаблонов лент без '
+        'кеша шаблонов, с кешем, с подстановкой include и в Jinja2.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=200)
+
+    def engines(self):
+        return {
+            'dev': django_engine('dev', SOURCE_LOADERS, debug=True),
+            'cached': django_engine(
+                'cached',
+                [('django.template.loaders.cached.Loader', SOURCE_LOADERS)],
+                debug=False,
+            ),
+            'cached+inline': django_engine(
+                'cached+inline',
+                [('django.template.loaders.cached.Loader', [
+                    ('core.template.loaders.InliningLoader', SOURCE_LOADERS,
+                     settings.TEMPLATE_INLINE_INCLUDES),
+                ])],
+                debug=False,
+            ),
+            'jinja2': jinja2_engine(),
+        }
+
+    def handle(self, *args, **options):
+        contexts = feed_contexts()
+        if not contexts:
+            raise CommandError('В базе нет постов: нечего измерять.')
+        author = contexts['posts/profile.html']['author']
+        request = feed_request(author)
+        engines = self.engines()
+        results = {mode: {} for mode in engines}
+        # Режимы чередуются по шаблонам, чтобы фон машины влиял на
+        # них одинаково; компиляция вынесена из замера.
+        for name, context in contexts.items():
+            for mode, engine in engines.items():
+                self.render(engine, name, context, request)
+                results[mode][name] = measure(
+                    lambda: self.render(engine, name, context, request),
+                    options['renders'],
+                    timer=time.process_time,
+                )
+        self.report(results)
+
+    def render(self, engine, name, context, request):
+        # Как django.shortcuts.render: шаблон ищется при каждом запросе
+        engine.get_template(name).render(context, request)
+
+    def report(self, results):
+        baseline = next(iter(results.values()))
+        for mode, timings in results.items():
+            self.stdout.write(mode)
+            for name, timing in timings.items():
+                speedup = baseline[name]['median'] / timing['median']
+                self.stdout.write(
+                    f'  {name:22} median {timing["median"]:.3f} ms CPU, '
+                    f'{1000 / timing["median"]:.0f} pages/s, x{speedup:.2f}'
+                )
@@ -0,0 +1,38 @@
+from core.startup import TARGETS, by_package, profile_imports
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, сколько времени уходит на импорты при запуске '
+        'manage.py и WSGI-приложения и какие модули самые тяжёлые.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='*',
+            help=f'Что профилировать: {", ".join(TARGETS)}; по умолчанию '
+                 'всё.',
+        )
+        parser.add_argument('--limit', type=int, default=15)
+
+    def handle(self, *args, **options):
+        unknown = set(options['targets']) - set(TARGETS)
+        if unknown:
+            raise CommandError(f'Неизвестные цели: {", ".join(unknown)}')
+        for target in options['targets'] or TARGETS:
+            modules, elapsed = profile_imports(target)
+            total = sum(total for _, _, total, top in modules if top)
+            self.stdout.write(
+                f'{target}: {len(modules)} модулей, импорты '
+                f'{total / 1000:.1f} мс, весь запуск {elapsed:.0f} мс'
+            )
+            if not options['limit']:
+                continue
+            self.stdout.write('  Пакеты (собственное время):')
+            for package, own in by_package(modules)[:options['limit']]:
+                self.stdout.write(f'    {own / 1000:8.1f} мс  {package}')
+            self.stdout.write('  Модули (вместе с зависимостями):')
+            heaviest = sorted(modules, key=lambda module: -module[2])
+            for name, _, total, _ in heaviest[:options['limit']]:
+                self.stdout.write(f'    {total / 1000:8.1f} мс  {name}')
@@ -0,0 +1,258 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from . import phased
+from .auth import get_user
+from .compression import (SUFFIXES, available_encodings, compress,
+                          compress_sequence, negotiate)
+from .db_router import has_written, pin_to_primary, unpin
+from .ratelimit import hit_window
+from .views import too_many_requests
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PrimaryPinningMiddleware:
+    """Read-your-writes для реплик.
+
+    Небезопасные запросы и все запросы в течение REPLICA_PIN_SECONDS
+    после записи читают из основной базы: об этом помнит кука.
+    """
+    cookie_name = 'pin_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        unpin()
+        if (
+            request.method not in SAFE_METHODS
+            or self.cookie_name in request.COOKIES
+        ):
+            pin_to_primary()
+        response = self.get_response(request)
+        if has_written():
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT без отдельного сервера.
+
+    Выбирает заранее сжатый вариант по Accept-Encoding, а файлы с
+    хешем в имени (см. core.storage) помечает как неизменяемые.
+    Если статика не собрана, middleware отключается.
+    """
+    immutable_re = re.compile(r'\.[0-9a-f]{12}\.')
+    immutable_max_age = 60 * 60 * 24 * 365
+    max_age = 60
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT or not os.path.isdir(
+            settings.STATIC_ROOT
+        ):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = settings.STATIC_ROOT
+        self.prefix = settings.STATIC_URL
+
+    def __call__(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path.startswith(self.prefix)
+        ):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime,
+            stat.st_size,
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = self.file_response(request, path)
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Vary'] = 'Accept-Encoding'
+        if self.immutable_re.search(name):
+            response['Cache-Control'] = (
+                f'public, max-age={self.immutable_max_age}, immutable'
+            )
+        else:
+            response['Cache-Control'] = f'public, max-age={self.max_age}'
+        return response
+
+    def file_response(self, request, path):
+        content_type, _ = mimetypes.guess_type(path)
+        encodings = [
+            encoding for encoding in available_encodings()
+            if os.path.isfile(path + SUFFIXES[encoding])
+        ]
+        encoding = negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), encodings
+        ) if encodings else None
+        if encoding is not None:
+            path += SUFFIXES[encoding]
+        response = FileResponse(open(path, 'rb'))
+        # Тип исходного файла, а не application/gzip для варианта .gz
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы в brotli или gzip по Accept-Encoding.
+
+    Для ответов, сжатых заранее (например, из кеша страниц, см.
+    core.decorators.compress_page), процессор не тратится.
+    """
+    min_length = 200
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        precompressed = getattr(response, 'precompressed', None)
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        elif precompressed and precompressed[0] == response.content:
+            # Сжато заранее, см. core.decorators.compress_page
+            response.content = precompressed[1][encoding]
+            response['Content-Length'] = str(len(response.content))
+        else:
+            compressed = compress(response.content, encoding, best=False)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сильный ETag описывал несжатое тело
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class PhasedRenderMiddleware:
+    """Второй проход дырявого кеша: рисует блоки {% phased %}.
+
+    Стоит после AuthenticationMiddleware и до CompressionMiddleware
+    (ответ проходит через него раньше сжатия). Анонимам отдаётся
+    заранее заполненный вариант страницы, если он есть.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        if response.streaming:
+            # Фрагменты не разрываются между кусками потока:
+            # core.streaming режет страницу только по блокам {% stream %}
+            response.streaming_content = (
+                phased.fill(chunk, request, response.charset)
+                for chunk in response.streaming_content
+            )
+        elif not phased.has_placeholders(response.content):
+            return response
+        elif (
+            getattr(response, 'anonymous_content', None) is not None
+            and not request.user.is_authenticated
+        ):
+            response.content = response.anonymous_content
+        else:
+            response.content = phased.fill(
+                response.content, request, response.charset
+            )
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware с пользователем из кеша, см. core.auth."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+class ThrottleMiddleware(MiddlewareMixin):
+    """Ограничивает частоту запросов к адресам из THROTTLE_RATES.
+
+    Лимиты заданы по имени адреса: 'user' - на вошедшего
+    пользователя, 'ip' - на анонимный адрес клиента. К запросу
+    применяется один из них, так что проверка - одно обращение к
+    кешу и ни одного к базе.
+    """
+
+    def __init__(self, get_response=None):
+        if not settings.THROTTLE_RATES:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        rates = settings.THROTTLE_RATES.get(match.view_name) if match else None
+        if not rates:
+            return None
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and 'user' in rates:
+            scope, ident = 'user', user.pk
+        elif 'ip' in rates:
+            scope, ident = 'ip', client_ip(request)
+        else:
+            return None
+        retry_after = hit_window(
+            f'{match.view_name}:{scope}:{ident}', rates[scope]
+        )
+        if retry_after:
+            return too_many_requests(request, retry_after)
+        return None
+
+
+def client_ip(request):
+    """Адрес клиента из THROTTLE_IP_HEADER, за прокси - первый в списке."""
+    value = request.META.get(settings.THROTTLE_IP_HEADER) or request.META.get(
+        'REMOTE_ADDR', ''
+    )
+    return value.split(',')[0].strip()
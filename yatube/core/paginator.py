@@ -0,0 +1,91 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+ELLIPSIS = '…'
+
+
+def elided_page_range(number, num_pages, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, пропуски - ELLIPSIS.
+
+    Тот же алгоритм, что у Paginator.get_elided_page_range в Django 3.2:
+    число ссылок не зависит от числа страниц.
+    """
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from range(1, num_pages + 1)
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+def estimate_row_count(model, using):
+    """Оценка числа строк таблицы без полного COUNT(*).
+
+    PostgreSQL хранит её в pg_class, для остальных баз берётся
+    максимальный целочисленный pk (индекс, а не скан таблицы).
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+        return None
+    if model._meta.pk.get_internal_type().endswith(
+        ('AutoField', 'IntegerField')
+    ):
+        return (
+            model._default_manager.using(using)
+            .aggregate(max_pk=Max('pk'))['max_pk'] or 0
+        )
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator для больших таблиц в админке.
+
+    Для нефильтрованного списка число объектов оценивается, точный
+    COUNT(*) считается только для отфильтрованных выборок.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return super().count
+
+
+class CountedPaginator(Paginator):
+    """Paginator, которому число объектов сообщает count_func.
+
+    Так счётчик можно брать из кеша, не выполняя COUNT(*) на каждой
+    странице ленты.
+    """
+
+    def __init__(self, object_list, per_page, count_func=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_func = count_func
+
+    @cached_property
+    def count(self):
+        if self.count_func is None:
+            return super().count
+        return self.count_func()
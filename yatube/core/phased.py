@@ -0,0 +1,65 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.template import engines
+
+SALT = 'core.phased'
+PREFIX = '<!--phased:'
+SUFFIX = '-->'
+PLACEHOLDER_RE = re.compile(
+    re.escape(PREFIX.encode())
+    + rb'(?P<token>[\w\-:.=]+)'
+    + re.escape(SUFFIX.encode())
+)
+
+
+def placeholder(using, template_name, values):
+    """Метка личного фрагмента: шаблон и значения для второго прохода.
+
+    Значения должны сериализоваться в JSON. Метка подписана, так что
+    подставить чужой шаблон или значения нельзя.
+    """
+    token = signing.dumps(
+        [using, template_name, values], salt=SALT, compress=True
+    )
+    return f'{PREFIX}{token}{SUFFIX}'
+
+
+def render_block(match, request, charset):
+    try:
+        using, template_name, values = signing.loads(
+            match.group('token').decode(), salt=SALT
+        )
+    except signing.BadSignature:
+        return b''
+    template = engines[using].get_template(template_name)
+    return template.render(values, request).encode(charset)
+
+
+def has_placeholders(content):
+    return PREFIX.encode() in content
+
+
+def fill(content, request, charset='utf-8'):
+    """Второй проход: рисует личные фрагменты в байтах content."""
+    return PLACEHOLDER_RE.sub(
+        lambda match: render_block(match, request, charset), content
+    )
+
+
+def prefill_anonymous(request, content, charset='utf-8'):
+    """Вариант страницы для анонимов, одинаковый для всех них.
+
+    Фрагменты, которым нужно что-то кроме статуса входа (например,
+    csrf_token), в такой вариант попадать не должны.
+    """
+    user = getattr(request, 'user', None)
+    request.user = AnonymousUser()
+    try:
+        return fill(content, request, charset)
+    finally:
+        if user is None:
+            del request.user
+        else:
+            request.user = user
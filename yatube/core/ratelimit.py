@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+BUCKET_KEY = 'ratelimit:bucket:{}'
+BUCKET_LOCK_KEY = 'ratelimit:lock:{}'
+# Блокировка корзины: сколько она живёт, если процесс упал внутри, и
+# сколько раз и с каким шагом её ждать
+LOCK_TIMEOUT = 5
+LOCK_ATTEMPTS = 50
+LOCK_WAIT = 0.01
+WINDOW_KEY = 'ratelimit:window:{}:{}'
+# Единицы периода в записи частоты '5/m'
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60): сколько запросов за сколько секунд."""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period[:1]]
+
+
+@contextmanager
+def bucket_lock(key):
+    """Блокировка корзины key через cache.add; даёт False, если её
+    не удалось взять за LOCK_ATTEMPTS попыток.
+    """
+    lock_key = BUCKET_LOCK_KEY.format(key)
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(lock_key, True, LOCK_TIMEOUT):
+            break
+        time.sleep(LOCK_WAIT)
+    else:
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        cache.delete(lock_key)
+
+
+def take_token(key, rate, now=None):
+    """Берёт жетон из корзины key с частотой rate.
+
+    Корзина вмещает count жетонов и пополняется равномерно, по
+    count за period, так что короткий всплеск до count запросов
+    проходит, а дальше - не чаще заданной частоты. Возвращает 0, если
+    жетон взят, или сколько секунд ждать следующего.
+
+    Чтение и запись корзины идут под bucket_lock: иначе параллельные
+    запросы прочли бы одну и ту же корзину и прошли бы все.
+    """
+    count, period = parse_rate(rate)
+    refill = count / period
+    cache_key = BUCKET_KEY.format(key)
+    with bucket_lock(key) as locked:
+        if not locked:
+            # Корзину сейчас меняет поток запросов того же ключа
+            return 1 / refill
+        now = now or time.time()
+        tokens, updated = cache.get(cache_key, (count, now))
+        tokens = min(count, tokens + (now - updated) * refill)
+        if tokens < 1:
+            return (1 - tokens) / refill
+        # Через period корзина снова полна: хранить дольше незачем
+        cache.set(cache_key, (tokens - 1, now), period)
+        return 0
+
+
+def hit_window(key, rate, now=None):
+    """Засчитывает запрос в окно key длиной period из rate.
+
+    Счётчик окна - один cache.incr, так что проверка стоит одного
+    обращения к кешу (ещё одного - на первый запрос в окне). Возвращает
+    0, если лимит не превышен, или сколько секунд до нового окна.
+    """
+    count, period = parse_rate(rate)
+    now = now or time.time()
+    window = int(now // period)
+    cache_key = WINDOW_KEY.format(key, window)
+    try:
+        hits = cache.incr(cache_key)
+    except ValueError:
+        hits = 1 if cache.add(cache_key, 1, period) else cache.incr(cache_key)
+    if hits > count:
+        return (window + 1) * period - now
+    return 0
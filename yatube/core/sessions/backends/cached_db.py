@@ -0,0 +1,26 @@
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    """cached_db с ленивым сохранением.
+
+    Сессия читается из кеша, а в базу (и заново в кеш) пишется, только
+    если её данные действительно изменились: запрос, который лишь
+    пометил сессию изменённой, не стоит UPDATE.
+    """
+
+    def load(self):
+        data = super().load()
+        self._saved_data = self.serializer().dumps(data)
+        return data
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and self.session_key is not None
+            and getattr(self, '_saved_data', None)
+            == self.serializer().dumps(self._get_session())
+        ):
+            return
+        super().save(must_create=must_create)
+        self._saved_data = self.serializer().dumps(self._get_session())
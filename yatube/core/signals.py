@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import forget_user
+from .db_router import reset_pin
+
+User = get_user_model()
+
+request_started.connect(reset_pin, dispatch_uid='core.reset_pin_started')
+request_finished.connect(reset_pin, dispatch_uid='core.reset_pin_finished')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
@@ -0,0 +1,67 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Что импортирует процесс до первого ответа
+TARGETS = {
+    'manage': 'import django; django.setup()',
+    'wsgi': (
+        'from yatube.wsgi import application; '
+        # URLconf загружается при первом запросе, до него воркер не готов
+        'from django.urls import get_resolver; get_resolver().url_patterns'
+    ),
+}
+IMPORT_LINE = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$'
+)
+
+
+def parse_importtime(output):
+    """Строки вывода python -X importtime: [(модуль, своё, всего, мкс)].
+
+    Вложенность в выводе задаётся отступом: у импортов верхнего уровня
+    его нет, поэтому сумма их «всего» - время всех импортов.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            own, total, indent, name = match.groups()
+            modules.append((name, int(own), int(total), len(indent) == 1))
+    return modules
+
+
+def profile_imports(target):
+    """Запускает target из TARGETS в чистом интерпретаторе.
+
+    Возвращает импорты и время запуска процесса в миллисекундах, с
+    накладными расходами самого -X importtime.
+    """
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = os.environ.get(
+        'DJANGO_SETTINGS_MODULE', 'yatube.settings'
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', TARGETS[target]],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    return parse_importtime(result.stderr), elapsed
+
+
+def by_package(modules):
+    """Собственное время импорта, сложенное по пакетам верхнего уровня."""
+    packages = defaultdict(int)
+    for name, own, _, _ in modules:
+        packages[name.partition('.')[0]] += own
+    return sorted(packages.items(), key=lambda item: -item[1])
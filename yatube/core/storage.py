@@ -0,0 +1,32 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import (COMPRESSIBLE_EXTENSIONS, SUFFIXES,
+                          available_encodings, compress)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хеш в именах файлов и заранее сжатые .br/.gz варианты.
+
+    Сжатые файлы пишутся рядом с хешированными во время collectstatic
+    и отдаются core.middleware.StaticFilesMiddleware.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as original:
+                data = original.read()
+            for encoding in available_encodings():
+                compressed = compress(data, encoding)
+                if len(compressed) >= len(data):
+                    continue
+                compressed_name = name + SUFFIXES[encoding]
+                if self.exists(compressed_name):
+                    self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(compressed))
+                yield name, compressed_name, True
@@ -0,0 +1,77 @@
+import secrets
+
+from django.http import StreamingHttpResponse
+from django.template import Context, loader
+from django.template.backends.jinja2 import Jinja2
+from django.template.backends.utils import csrf_input_lazy, csrf_token_lazy
+
+# Ключ контекста со списком отложенных блоков {% stream %}
+STREAM_KEY = 'stream_deferred'
+# Метка места отложенного блока в уже отрисованной странице. Она
+# случайная для каждой отрисовки, поэтому текст постов и комментариев
+# совпасть с ней не может, какие бы символы в нём ни были.
+MARKER_KEY = 'stream_marker'
+# Сколько событий Jinja2 копится перед отправкой очередного куска
+JINJA2_BUFFER_SIZE = 20
+
+
+def defer(nodelist, context):
+    """Откладывает отрисовку nodelist до отправки страницы.
+
+    Возвращает метку, которую stream_template заменит результатом.
+    """
+    flat = context.flatten()
+    if 'forloop' in flat:
+        # ForNode меняет один и тот же словарь на каждой итерации
+        flat['forloop'] = dict(flat['forloop'])
+    snapshot = Context(
+        flat,
+        autoescape=context.autoescape,
+        use_l10n=context.use_l10n,
+        use_tz=context.use_tz,
+    )
+    snapshot.template = context.template
+    snapshot.template_name = context.template_name
+    context[STREAM_KEY].append((nodelist, snapshot))
+    return context[MARKER_KEY]
+
+
+def django_chunks(template, context, request):
+    deferred = []
+    marker = f'<!-- stream {secrets.token_hex(16)} -->'
+    page = template.render(
+        {**context, STREAM_KEY: deferred, MARKER_KEY: marker}, request
+    )
+    parts = iter(page.split(marker))
+    yield next(parts)
+    for (nodelist, snapshot), part in zip(deferred, parts):
+        yield nodelist.render(snapshot) + part
+
+
+def jinja2_chunks(template, context, request):
+    # Контекст как в django.template.backends.jinja2.Template.render
+    context = {
+        **context,
+        'request': request,
+        'csrf_input': csrf_input_lazy(request),
+        'csrf_token': csrf_token_lazy(request),
+    }
+    for context_processor in template.backend.template_context_processors:
+        context.update(context_processor(request))
+    stream = template.template.stream(context)
+    stream.enable_buffering(JINJA2_BUFFER_SIZE)
+    return stream
+
+
+def stream_template(request, template_name, context, using=None):
+    """Потоковый аналог django.shortcuts.render.
+
+    Оформление страницы уходит клиенту сразу, а блоки {% stream %}
+    (в Jinja2 - весь шаблон) отрисовываются по мере отправки.
+    """
+    template = loader.get_template(template_name, using=using)
+    if isinstance(template.backend, Jinja2):
+        chunks = jinja2_chunks(template, context, request)
+    else:
+        chunks = django_chunks(template, context, request)
+    return StreamingHttpResponse(chunks)
@@ -0,0 +1,52 @@
+import re
+
+from django.template import TemplateDoesNotExist
+from django.template.loaders.base import Loader
+
+INCLUDE_RE = re.compile(r'{%\s*include\s+([\'"])(?P<name>[^\'"]+)\1\s*%}')
+
+
+class InliningLoader(Loader):
+    """Подставляет текст шаблонов из inline на место их {% include %}.
+
+    Включение без with/only эквивалентно вставке текста шаблона, но
+    не требует отдельного Template и его отрисовки на каждой итерации
+    цикла. Ищет шаблоны через вложенные загрузчики; предназначен
+    для работы внутри django.template.loaders.cached.Loader.
+    """
+
+    def __init__(self, engine, loaders, inline=()):
+        super().__init__(engine)
+        self.loaders = engine.get_template_loaders(loaders)
+        self.inline = frozenset(inline)
+
+    def get_template_sources(self, template_name):
+        # cached.Loader читает шаблон через origin.loader, поэтому
+        # origin указывает на этот загрузчик, а не на вложенный
+        for loader in self.loaders:
+            for origin in loader.get_template_sources(template_name):
+                origin.inner_loader = origin.loader
+                origin.loader = self
+                yield origin
+
+    def get_contents(self, origin):
+        return self.inline_includes(
+            origin.inner_loader.get_contents(origin), ()
+        )
+
+    def inline_includes(self, source, seen):
+        def replace(match):
+            name = match.group('name')
+            if name not in self.inline or name in seen:
+                return match.group(0)
+            return self.inline_includes(self.find_source(name), seen + (name,))
+
+        return INCLUDE_RE.sub(replace, source)
+
+    def find_source(self, template_name):
+        for origin in self.get_template_sources(template_name):
+            try:
+                return origin.inner_loader.get_contents(origin)
+            except TemplateDoesNotExist:
+                continue
+        raise TemplateDoesNotExist(template_name)
@@ -0,0 +1,20 @@
+from django import template
+
+from ..paginator import ELLIPSIS, elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=2, on_ends=1):
+    return list(elided_page_range(
+        page_obj.number,
+        page_obj.paginator.num_pages,
+        on_each_side,
+        on_ends,
+    ))
+
+
+@register.filter
+def is_ellipsis(value):
+    return value == ELLIPSIS
@@ -0,0 +1,20 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..phased import placeholder
+
+register = template.Library()
+
+
+@register.simple_tag
+def phased(template_name, **values):
+    """Личный фрагмент страницы, который рисуется вторым проходом.
+
+    {% phased 'posts/includes/follow_button.html' author_id=author.pk %}
+
+    Страница с такими фрагментами одинакова для всех пользователей и
+    кешируется один раз, а core.middleware.PhasedRenderMiddleware
+    рисует их для каждого запроса с контекстом из процессоров и
+    переданных значений.
+    """
+    return mark_safe(placeholder('django', template_name, values))
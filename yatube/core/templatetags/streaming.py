@@ -0,0 +1,28 @@
+from django import template
+
+from ..streaming import STREAM_KEY, defer
+
+register = template.Library()
+
+
+class StreamNode(template.Node):
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        if STREAM_KEY not in context:
+            return self.nodelist.render(context)
+        return defer(self.nodelist, context)
+
+
+@register.tag
+def stream(parser, token):
+    """Блок, который при потоковой отрисовке отправляется отдельно.
+
+    {% stream %}...{% endstream %} - обычно тело цикла по постам:
+    каждая карточка уходит клиенту, как только готова.
+    """
+    nodelist = parser.parse(('endstream',))
+    parser.delete_first_token()
+    return StreamNode(nodelist)
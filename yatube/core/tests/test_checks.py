@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import unittest
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from .. import checks
+
+PROD_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {'loaders': [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+        ]),
+    ]},
+}]
+
+
+# Открывает кеш и компилирует страницу в профиле prod
+PROD_SMOKE = """
+import django
+django.setup()
+from django.core.cache import caches
+from django.template.loader import get_template
+cache = caches['default']
+cache._cache
+print(type(cache).__name__)
+print(type(get_template('posts/index.html')).__name__)
+"""
+
+
+def run_prod(*args):
+    """Запускает интерпретатор с args в профиле prod."""
+    env = dict(
+        os.environ,
+        DJANGO_ENV='prod',
+        DJANGO_SECRET_KEY='test',
+        DJANGO_SETTINGS_MODULE='yatube.settings',
+    )
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+    )
+
+
+def ids(warnings):
+    return [warning.id for warning in warnings]
+
+
+class PerformanceChecksTest(SimpleTestCase):
+
+    @override_settings(DEBUG=True)
+    def test_debug(self):
+        self.assertIn('core.W001', ids(checks.check_debug(None)))
+
+    def test_local_cache(self):
+        self.assertEqual(ids(checks.check_caches(None)), ['core.W003'])
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyLibMCCache',
+        }}):
+            self.assertEqual(checks.check_caches(None), [])
+
+    def test_missing_cache_library(self):
+        backend = 'django.core.cache.backends.memcached.MemcachedCache'
+        if find_spec('memcache'):
+            self.skipTest('python-memcached установлен')
+        with override_settings(CACHES={'default': {'BACKEND': backend}}):
+            self.assertEqual(ids(checks.check_caches(None)), ['core.E001'])
+
+    def test_template_loaders(self):
+        self.assertEqual(ids(checks.check_templates(None)), ['core.W004'])
+        with override_settings(TEMPLATES=PROD_TEMPLATES):
+            self.assertEqual(checks.check_templates(None), [])
+
+    def test_follow_counters(self):
+        self.assertEqual(checks.check_follow_counters(None), [])
+        connection.vendor = 'oracle'
+        self.addCleanup(delattr, connection, 'vendor')
+        self.assertEqual(
+            ids(checks.check_follow_counters(None)), ['core.W011']
+        )
+
+    @override_settings(
+        JOBS_ALWAYS_EAGER=False,
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        SESSION_ENGINE='django.contrib.sessions.backends.db',
+    )
+    def test_background_work(self):
+        self.assertEqual(
+            ids(checks.check_background_work(None)),
+            ['core.W009', 'core.W010'],
+        )
+
+
+@unittest.skipUnless(find_spec('pylibmc'), 'нужен pylibmc')
+class ProdProfileTest(SimpleTestCase):
+
+    def test_prod_profile_passes(self):
+        result = run_prod(
+            'manage.py', 'check', '--deploy',
+            '--tag', checks.PERFORMANCE, '--fail-level', 'WARNING',
+        )
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+    def test_cache_and_templates_load(self):
+        # Сервер memcached не нужен: клиент соединяется при первой команде
+        result = run_prod('-c', PROD_SMOKE)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        self.assertEqual(result.stdout.split(), ['PyLibMCCache', 'Template'])
@@ -0,0 +1,63 @@
+import gzip
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from ..compression import brotli, compress_sequence
+from ..middleware import CompressionMiddleware
+
+CONTENT = 'Пост ' * 200
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, response, accept_encoding=''):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip(self):
+        response = self.get(HttpResponse(CONTENT), 'gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            gzip.decompress(response.content).decode(), CONTENT
+        )
+
+    def test_brotli_is_preferred(self):
+        if brotli is None:
+            self.skipTest('brotli не установлен')
+        response = self.get(HttpResponse(CONTENT), 'gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content).decode(), CONTENT)
+
+    def test_identity(self):
+        response = self.get(HttpResponse(CONTENT))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_short_and_encoded_responses_are_left_alone(self):
+        encoded = HttpResponse(CONTENT)
+        encoded['Content-Encoding'] = 'gzip'
+        for response in (HttpResponse('short'), encoded):
+            with self.subTest(response=response):
+                content = response.content
+                self.assertEqual(self.get(response, 'gzip').content, content)
+
+    def test_streaming_chunks_are_flushed(self):
+        chunks = [CONTENT.encode()] * 3
+        response = self.get(StreamingHttpResponse(iter(chunks)), 'gzip')
+        compressed = list(response.streaming_content)
+        self.assertTrue(all(compressed[:3]))
+        self.assertEqual(
+            gzip.decompress(b''.join(compressed)), b''.join(chunks)
+        )
+
+    def test_brotli_sequence(self):
+        if brotli is None:
+            self.skipTest('brotli не установлен')
+        chunks = [CONTENT.encode()] * 3
+        compressed = b''.join(compress_sequence(iter(chunks), 'br'))
+        self.assertEqual(brotli.decompress(compressed), b''.join(chunks))
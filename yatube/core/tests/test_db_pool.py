@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+from ..db.backends.sqlite3.base import DatabaseWrapper
+from ..db.pool import ConnectionPool, PoolTimeout
+
+
+def connect(params):
+    return sqlite3.connect(':memory:', check_same_thread=False)
+
+
+class ConnectionPoolTest(SimpleTestCase):
+
+    def test_connection_is_reused(self):
+        pool = ConnectionPool(connect, max_size=1)
+        conn, created_at = pool.checkout({})
+        pool.checkin(conn, created_at)
+        again, _ = pool.checkout({})
+        self.assertIs(again, conn)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['checkouts'], 2)
+
+    def test_checkout_waits_for_free_slot(self):
+        pool = ConnectionPool(connect, max_size=1, timeout=0.01)
+        pool.checkout({})
+        with self.assertRaises(PoolTimeout):
+            pool.checkout({})
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_expired_connection_is_replaced(self):
+        pool = ConnectionPool(connect, max_size=1, max_age=0)
+        conn, created_at = pool.checkout({})
+        pool.checkin(conn, created_at)
+        again, _ = pool.checkout({})
+        self.assertIsNot(again, conn)
+
+    def test_open_transaction_is_rolled_back_on_checkin(self):
+        pool = ConnectionPool(connect, max_size=1)
+        conn, created_at = pool.checkout({})
+        conn.execute('CREATE TABLE t (x)')
+        conn.execute('INSERT INTO t VALUES (1)')
+        self.assertTrue(conn.in_transaction)
+        pool.checkin(conn, created_at)
+        self.assertFalse(conn.in_transaction)
+
+
+class HealthCheckTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.wrapper = DatabaseWrapper({
+            **connections['default'].settings_dict,
+            'NAME': os.path.join(directory.name, 'health.sqlite3'),
+            'CONN_HEALTH_CHECKS': True,
+        }, alias='health')
+        self.addCleanup(self.wrapper.close)
+
+    def test_connection_closed_underneath_is_replaced(self):
+        self.wrapper.ensure_connection()
+        broken = self.wrapper.connection
+        broken.close()
+        self.assertFalse(self.wrapper.is_usable())
+        # Новый запрос: проверка выполняется снова
+        self.wrapper.close_if_unusable_or_obsolete()
+        self.wrapper.ensure_connection()
+        self.assertIsNot(self.wrapper.connection, broken)
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from posts.models import Post
+
+from ..db_router import PrimaryReplicaRouter, pin_to_primary, unpin
+from ..middleware import PrimaryPinningMiddleware
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class PrimaryReplicaRouterTest(TestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        unpin()
+
+    def tearDown(self):
+        unpin()
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Post), 'replica1')
+
+    def test_writes_go_to_primary_and_pin(self):
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_bookkeeping_writes_do_not_pin(self):
+        self.assertEqual(self.router.db_for_write(Job), 'default')
+        self.assertEqual(self.router.db_for_read(Job), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'replica1')
+
+    def test_writes_outside_requests_do_not_pin_forever(self):
+        self.router.db_for_write(Post)
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(self.router.db_for_read(Post), 'replica1')
+
+    def test_pinned_reads_go_to_primary(self):
+        pin_to_primary()
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_reads_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+class PrimaryPinningMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='writer')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_write_sets_pin_cookie(self):
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertIn(PrimaryPinningMiddleware.cookie_name, response.cookies)
+
+    def test_read_does_not_set_pin_cookie(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(
+            PrimaryPinningMiddleware.cookie_name, response.cookies
+        )
@@ -0,0 +1,108 @@
+import threading
+import unittest
+from importlib.util import find_spec
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (check_password, get_hasher,
+                                         identify_hasher, make_password)
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import hashers
+
+User = get_user_model()
+FAST_SCRYPT = {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1}
+FAST_ARGON2 = {'time_cost': 1, 'memory_cost': 1024, 'parallelism': 1}
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        'core.hashers.ScryptPasswordHasher',
+        'core.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ],
+    PASSWORD_SCRYPT=FAST_SCRYPT,
+    PASSWORD_ARGON2=FAST_ARGON2,
+)
+class ScryptHasherTest(SimpleTestCase):
+
+    def test_encode_and_verify(self):
+        encoded = make_password('secret', salt='salt')
+        self.assertTrue(encoded.startswith('scrypt$1024$salt$8$1$'))
+        self.assertTrue(check_password('secret', encoded))
+        self.assertFalse(check_password('wrong', encoded))
+
+    def test_old_parameters_need_update(self):
+        encoded = make_password('secret')
+        hasher = identify_hasher(encoded)
+        self.assertFalse(hasher.must_update(encoded))
+        with override_settings(
+            PASSWORD_SCRYPT={**FAST_SCRYPT, 'work_factor': 2 ** 11}
+        ):
+            self.assertTrue(hasher.must_update(encoded))
+            # Старый хеш по-прежнему проверяется
+            self.assertTrue(check_password('secret', encoded))
+
+    @unittest.skipUnless(find_spec('argon2'), 'нужен argon2-cffi')
+    def test_argon2_parameters_from_settings(self):
+        encoded = make_password('secret', hasher='argon2')
+        self.assertIn('m=1024,t=1,p=1', encoded)
+        self.assertTrue(check_password('secret', encoded))
+        with override_settings(
+            PASSWORD_ARGON2={**FAST_ARGON2, 'time_cost': 2}
+        ):
+            self.assertTrue(get_hasher('argon2').must_update(encoded))
+
+    @override_settings(PASSWORD_HASHING_THREADS=2)
+    def test_hashing_in_pool(self):
+        threads = []
+
+        def kdf():
+            threads.append(threading.current_thread().name)
+            return 'hash'
+
+        self.assertEqual(hashers.run_kdf(kdf), 'hash')
+        self.assertTrue(threads[0].startswith('password-hashing'))
+        self.assertTrue(check_password('secret', make_password('secret')))
+
+    @override_settings(PASSWORD_HASHING_THREADS=2)
+    def test_one_pool_for_concurrent_first_calls(self):
+        self.addCleanup(setattr, hashers, '_executor', hashers._executor)
+        hashers._executor = None
+        self.addCleanup(lambda: hashers._executor.shutdown())
+        barrier = threading.Barrier(8)
+        workers = set()
+
+        def kdf():
+            workers.add(threading.current_thread())
+            return 'hash'
+
+        def login():
+            barrier.wait()
+            hashers.run_kdf(kdf)
+
+        callers = [threading.Thread(target=login) for _ in range(8)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        self.assertLessEqual(len(workers), 2)
+
+
+@override_settings(
+    PASSWORD_HASHERS=[
+        'core.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ],
+    PASSWORD_SCRYPT=FAST_SCRYPT,
+)
+class RehashOnLoginTest(TestCase):
+
+    def test_pbkdf2_hash_is_replaced_on_login(self):
+        user = User.objects.create(
+            username='old',
+            password=make_password('secret', hasher='pbkdf2_sha256'),
+        )
+        self.assertTrue(self.client.login(username='old', password='secret'))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+        self.assertTrue(user.check_password('secret'))
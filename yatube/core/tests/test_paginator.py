@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from posts.models import Post
+
+from ..paginator import (ELLIPSIS, EstimatedCountPaginator,
+                         elided_page_range)
+
+User = get_user_model()
+
+
+class EstimatedCountPaginatorTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user_test')
+        self.posts = [
+            Post.objects.create(author=self.user, text=f'Пост {i}')
+            for i in range(5)
+        ]
+
+    def test_unfiltered_count_is_estimated(self):
+        self.posts[0].delete()
+        paginator = EstimatedCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(paginator.count, self.posts[-1].pk)
+
+    def test_filtered_count_is_exact(self):
+        paginator = EstimatedCountPaginator(
+            Post.objects.filter(pk__in=[self.posts[0].pk]), 2
+        )
+        self.assertEqual(paginator.count, 1)
+
+
+class ElidedPageRangeTest(TestCase):
+
+    def test_few_pages_are_all_shown(self):
+        self.assertEqual(list(elided_page_range(2, 5)), [1, 2, 3, 4, 5])
+
+    def test_middle_page_window(self):
+        self.assertEqual(
+            list(elided_page_range(500, 10000)),
+            [1, ELLIPSIS, 498, 499, 500, 501, 502, ELLIPSIS, 10000],
+        )
+
+    def test_first_and_last_pages(self):
+        self.assertEqual(
+            list(elided_page_range(1, 10000)),
+            [1, 2, 3, ELLIPSIS, 10000],
+        )
+        self.assertEqual(
+            list(elided_page_range(10000, 10000)),
+            [1, ELLIPSIS, 9998, 9999, 10000],
+        )
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from .. import phased
+
+User = get_user_model()
+
+
+class PhasedTest(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_user(username='user_test')
+
+    def test_fill_renders_for_request_user(self):
+        content = (
+            'до ' + phased.placeholder('django', 'includes/nav.html', {})
+            + ' после'
+        ).encode()
+        filled = phased.fill(content, self.request).decode()
+        self.assertTrue(filled.startswith('до '))
+        self.assertTrue(filled.endswith(' после'))
+        self.assertIn('Пользователь: user_test', filled)
+        anonymous = phased.prefill_anonymous(self.request, content).decode()
+        self.assertIn('Войти', anonymous)
+        self.assertEqual(self.request.user.username, 'user_test')
+
+    def test_forged_placeholder_is_dropped(self):
+        token = phased.placeholder('django', 'includes/nav.html', {})
+        forged = token.replace('phased:', 'phased:x', 1).encode()
+        self.assertEqual(phased.fill(forged, self.request), b'')
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..ratelimit import bucket_lock, hit_window, parse_rate, take_token
+
+User = get_user_model()
+
+
+class SlowCache(LocMemCache):
+    """Кеш с задержкой ответа, как у сетевого: между чтением и
+    записью успевают вклиниться другие потоки.
+    """
+
+    def get(self, *args, **kwargs):
+        value = super().get(*args, **kwargs)
+        time.sleep(0.005)
+        return value
+
+
+class TokenBucketTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('100/hour'), (100, 3600))
+
+    def test_burst_then_steady_rate(self):
+        for _ in range(3):
+            self.assertEqual(take_token('user', '3/m', now=1000), 0)
+        self.assertAlmostEqual(take_token('user', '3/m', now=1000), 20)
+        self.assertAlmostEqual(take_token('user', '3/m', now=1010), 10)
+        self.assertEqual(take_token('user', '3/m', now=1020), 0)
+        self.assertGreater(take_token('user', '3/m', now=1020), 0)
+
+    def test_buckets_are_separate(self):
+        take_token('first', '1/s', now=1000)
+        self.assertGreater(take_token('first', '1/s', now=1000), 0)
+        self.assertEqual(take_token('second', '1/s', now=1000), 0)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'core.tests.test_ratelimit.SlowCache',
+        'LOCATION': 'slow',
+    }})
+    def test_parallel_requests_share_bucket(self):
+        barrier = threading.Barrier(10)
+        results = []
+
+        def comment():
+            barrier.wait()
+            results.append(take_token('storm', '3/m'))
+
+        threads = [threading.Thread(target=comment) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(0), 3)
+
+    def test_busy_bucket_is_limited(self):
+        with bucket_lock('user'):
+            self.assertGreater(take_token('user', '3/m'), 0)
+        self.assertEqual(take_token('user', '3/m'), 0)
+
+
+class FixedWindowTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_resets_with_window(self):
+        self.assertEqual(hit_window('ip', '2/m', now=1200), 0)
+        self.assertEqual(hit_window('ip', '2/m', now=1210), 0)
+        self.assertEqual(hit_window('ip', '2/m', now=1230), 30)
+        self.assertEqual(hit_window('ip', '2/m', now=1260), 0)
+
+
+@override_settings(THROTTLE_RATES={
+    'users:login': {'ip': '2/m'},
+    'posts:post_create': {'user': '1/m', 'ip': '100/m'},
+})
+class ThrottleMiddlewareTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='writer')
+
+    def test_anonymous_limited_by_ip(self):
+        url = reverse('users:login')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertTemplateUsed(response, 'core/429.html')
+        other = self.client.get(url, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other.status_code, 200)
+
+    def test_user_limited_by_account(self):
+        self.client.force_login(self.user)
+        url = reverse('posts:post_create')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response['Retry-After']) <= 60)
+
+    def test_unlisted_urls_are_not_counted(self):
+        for _ in range(3):
+            response = self.client.get(reverse('posts:index'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_no_database_queries(self):
+        url = reverse('users:login')
+        self.client.get(url)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 429)
@@ -0,0 +1,76 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+@override_settings(SESSION_ENGINE='core.sessions.backends.cached_db')
+class CachedSessionTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.engine = import_module(settings.SESSION_ENGINE)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_unchanged_session_is_not_written(self):
+        session = self.engine.SessionStore()
+        session['key'] = 'value'
+        session.save()
+        session = self.engine.SessionStore(session.session_key)
+        session['key'] = 'value'
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_session_is_written(self):
+        session = self.engine.SessionStore()
+        session['key'] = 'value'
+        session.save()
+        session = self.engine.SessionStore(session.session_key)
+        session['key'] = 'other'
+        session.save()
+        cache.clear()
+        session = self.engine.SessionStore(session.session_key)
+        self.assertEqual(session['key'], 'other')
+
+
+class CachedUserTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user_test')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('about:author')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_authenticated_requests_skip_database(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(queries), 0)
+        self.assertContains(response, 'Пользователь: user_test')
+
+    def test_user_changes_are_seen(self):
+        self.client.get(self.url)
+        self.user.username = 'renamed'
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Пользователь: renamed')
+
+    def test_password_change_logs_out(self):
+        self.client.get(self.url)
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Войти')
@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+from ..startup import by_package, parse_importtime
+
+OUTPUT = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.version
+import time:       300 |        420 |   django.utils
+import time:       500 |        920 | django
+import time:        80 |         80 | posts.models
+Traceback lines and other stderr are ignored
+'''
+
+
+class ParseImporttimeTest(SimpleTestCase):
+
+    def test_parses_nesting_and_times(self):
+        self.assertEqual(parse_importtime(OUTPUT), [
+            ('django.utils.version', 120, 120, False),
+            ('django.utils', 300, 420, False),
+            ('django', 500, 920, True),
+            ('posts.models', 80, 80, True),
+        ])
+
+    def test_sums_own_time_by_package(self):
+        self.assertEqual(
+            by_package(parse_importtime(OUTPUT)),
+            [('django', 920), ('posts', 80)],
+        )
@@ -0,0 +1,85 @@
+import gzip
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..compression import brotli, negotiate
+
+STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class StaticPipelineTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.url = staticfiles_storage.url('css/bootstrap.min.css')
+        with open(staticfiles_storage.path('css/bootstrap.min.css'),
+                  'rb') as original:
+            self.content = original.read()
+
+    def test_hashed_files_are_immutable(self):
+        self.assertRegex(self.url, r'bootstrap\.min\.[0-9a-f]{12}\.css$')
+        response = self.client.get(self.url)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_unhashed_files_are_revalidated(self):
+        response = self.client.get('/static/css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_gzip_variant(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            self.content,
+        )
+
+    def test_brotli_variant(self):
+        if brotli is None:
+            self.skipTest('brotli не установлен')
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip, deflate, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(
+            brotli.decompress(b''.join(response.streaming_content)),
+            self.content,
+        )
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_negotiate(self):
+        cases = (
+            ('gzip', ('br', 'gzip'), 'gzip'),
+            ('br;q=0, gzip', ('br', 'gzip'), 'gzip'),
+            ('*', ('br', 'gzip'), 'br'),
+            ('identity', ('br', 'gzip'), None),
+        )
+        for accept, encodings, expected in cases:
+            with self.subTest(accept=accept):
+                self.assertEqual(negotiate(accept, encodings), expected)
@@ -0,0 +1,58 @@
+from django.template import Context, Engine
+from django.test import SimpleTestCase
+
+TEMPLATES = {
+    'page.html': (
+        '{% for item in items %}'
+        '{% include "item.html" %}{% include "other.html" %}'
+        '{% endfor %}'
+    ),
+    'item.html': '{% load static %}<i>{{ item }}</i>{% include "deep.html" %}',
+    'deep.html': '.',
+    'other.html': ';',
+}
+
+LIBRARIES = {'static': 'django.templatetags.static'}
+
+
+INLINING_LOADER = ('core.template.loaders.InliningLoader', [
+    ('django.template.loaders.locmem.Loader', TEMPLATES),
+], ['item.html', 'deep.html'])
+
+
+class InliningLoaderTest(SimpleTestCase):
+
+    def setUp(self):
+        self.engine = Engine(libraries=LIBRARIES, loaders=[INLINING_LOADER])
+
+    def test_includes_are_inlined(self):
+        template = self.engine.get_template('page.html')
+        source = template.source
+        self.assertNotIn('include "item.html"', source)
+        self.assertNotIn('include "deep.html"', source)
+        self.assertIn('include "other.html"', source)
+
+    def test_render_matches_include(self):
+        plain = Engine(libraries=LIBRARIES, loaders=[
+            ('django.template.loaders.locmem.Loader', TEMPLATES),
+        ])
+        context = {'items': [1, 2]}
+        self.assertEqual(
+            self.engine.get_template('page.html').render(Context(context)),
+            plain.get_template('page.html').render(Context(context)),
+        )
+
+
+class CachedInliningLoaderTest(InliningLoaderTest):
+    """Так загрузчик подключён в боевом профиле."""
+
+    def setUp(self):
+        self.engine = Engine(libraries=LIBRARIES, loaders=[
+            ('django.template.loaders.cached.Loader', [INLINING_LOADER]),
+        ])
+
+    def test_compiled_once(self):
+        self.assertIs(
+            self.engine.get_template('page.html'),
+            self.engine.get_template('page.html'),
+        )
@@ -1,3 +1,5 @@
+import math
+
 from django.shortcuts import render
 
 
@@ -13,3 +15,13 @@ def server_error(request, reason=''):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def too_many_requests(request, retry_after):
+    """Ответ 429 с заголовком Retry-After в целых секундах."""
+    retry_after = math.ceil(retry_after)
+    response = render(
+        request, 'core/429.html', {'retry_after': retry_after}, status=429
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
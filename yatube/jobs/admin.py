@@ -0,0 +1,35 @@
+from django.contrib import admin
+
+from .models import Job, OutgoingEmail
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'priority',
+        'attempts',
+        'run_at',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('=idempotency_key',)
+    empty_value_display = '-пусто-'
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'recipients',
+        'attempts',
+        'failed',
+        'send_after',
+        'created',
+    )
+    list_filter = ('failed',)
+    exclude = ('message',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,188 @@
+import json
+import logging
+import uuid
+from datetime import timedelta
+from email import message_from_bytes
+from email.message import Message
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+from .queue import enqueue
+
+logger = logging.getLogger(__name__)
+
+# Задача отправки уже поставлена и ещё не начата
+FLUSH_KEY = 'mail:flush'
+SEND_TASK = 'jobs.send_queued_email'
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Складывает письма в OutgoingEmail вместо отправки.
+
+    Запрос только пишет строки в базу, а почтовый сервер ждёт воркер
+    очереди задач. Строки пишутся в текущей транзакции вызывающего
+    кода: внутри transaction.atomic письма откатятся вместе с ней, а
+    вне её (ATOMIC_REQUESTS не включён) сохраняются сразу.
+    """
+
+    def send_messages(self, email_messages):
+        emails = [
+            OutgoingEmail(
+                from_email=message.from_email,
+                recipients=json.dumps(message.recipients()),
+                message=message.message().as_bytes(linesep='\r\n'),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        if not emails:
+            return 0
+        OutgoingEmail.objects.bulk_create(emails)
+        schedule()
+        return len(emails)
+
+
+class StoredMIME(Message):
+    """Разобранное сообщение с as_bytes() в манере django.core.mail."""
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        return super().as_bytes(
+            unixfrom, policy=self.policy.clone(linesep=linesep)
+        )
+
+
+class StoredMessage(EmailMessage):
+    """Готовое MIME-сообщение из очереди для обычных почтовых бэкендов."""
+
+    def __init__(self, from_email, recipients, raw):
+        super().__init__(from_email=from_email)
+        self.stored_recipients = recipients
+        self.raw = raw
+
+    def recipients(self):
+        return self.stored_recipients
+
+    def message(self):
+        return message_from_bytes(self.raw, StoredMIME)
+
+
+def schedule():
+    """Ставит задачу отправки, если она ещё не ждёт в очереди.
+
+    Отметка и задача появляются после фиксации транзакции: при откате
+    писем нет, и отметка не задержала бы следующие письма.
+    """
+    transaction.on_commit(_schedule)
+
+
+def _schedule():
+    if cache.add(FLUSH_KEY, True, settings.EMAIL_QUEUE_FLUSH_TIMEOUT):
+        enqueue(SEND_TASK)
+
+
+def ready_emails(now):
+    return OutgoingEmail.objects.filter(failed=False, send_after__lte=now)
+
+
+def claim_batch(now):
+    """Захватывает до EMAIL_BATCH_SIZE готовых писем.
+
+    Захват - условный UPDATE с меткой пачки, поэтому параллельные
+    задачи не отправят одно письмо дважды. Пачка, чей воркер упал,
+    снова становится готовой через EMAIL_SEND_TIMEOUT секунд; перед
+    отправкой каждого письма send_batch продлевает его захват.
+    """
+    ready = ready_emails(now)
+    ids = list(ready.values_list('pk', flat=True)[:settings.EMAIL_BATCH_SIZE])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    ready.filter(pk__in=ids).update(claim=token, send_after=_lease_end(now))
+    return list(OutgoingEmail.objects.filter(claim=token))
+
+
+def _lease_end(now):
+    return now + timedelta(seconds=settings.EMAIL_SEND_TIMEOUT)
+
+
+def _renew(email):
+    """Продлевает захват письма; False, если его забрал другой воркер."""
+    return OutgoingEmail.objects.filter(
+        pk=email.pk, claim=email.claim
+    ).update(send_after=_lease_end(timezone.now())) == 1
+
+
+def _retry_later(email, error, now):
+    """Откладывает письмо с ошибкой; возвращает задержку или None."""
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    delay = None
+    if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        email.failed = True
+    else:
+        delay = settings.EMAIL_RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.send_after = now + timedelta(seconds=delay)
+    OutgoingEmail.objects.filter(pk=email.pk, claim=email.claim).update(
+        attempts=email.attempts,
+        claim='',
+        last_error=email.last_error,
+        failed=email.failed,
+        send_after=email.send_after,
+    )
+    return delay
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except Exception:
+        # Соединение уже разорвано, закрывать нечего
+        pass
+
+
+def send_batch(now=None):
+    """Отправляет пачку писем через одно соединение EMAIL_QUEUE_BACKEND.
+
+    Возвращает (число отправленных, задержку до ближайшего повтора
+    или None). Отправленное письмо сразу удаляется, поэтому медленная
+    пачка не отправит его повторно, даже если её захват истечёт. После
+    ошибки соединение открывается заново; письмо с ошибкой повторяется
+    с растущей задержкой, а после EMAIL_MAX_ATTEMPTS попыток
+    помечается неотправленным.
+    """
+    now = now or timezone.now()
+    emails = claim_batch(now)
+    if not emails:
+        return 0, None
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    sent, retry_in = 0, None
+    try:
+        for email in emails:
+            if not _renew(email):
+                continue
+            try:
+                # Уже открытое соединение open() не трогает
+                connection.open()
+                connection.send_messages([StoredMessage(
+                    email.from_email,
+                    json.loads(email.recipients),
+                    bytes(email.message),
+                )])
+            except Exception as error:
+                logger.warning('Письмо %s не отправлено: %s', email.pk, error)
+                _close(connection)
+                delay = _retry_later(email, error, now)
+                if delay is not None:
+                    retry_in = min(delay, retry_in or delay)
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).delete()
+                sent += 1
+    finally:
+        _close(connection)
+    return sent, retry_in
@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+
+from core.db_router import pin_to_primary
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from jobs.queue import claim_next, purge_done, run_job
+
+
+def work(burst):
+    pin_to_primary()
+    processed = 0
+    purged = 0
+    while True:
+        close_old_connections()
+        job = claim_next()
+        if job is None:
+            # Чистка старых выполненных задач - в простое воркера
+            if time.monotonic() - purged > settings.JOBS_PURGE_INTERVAL:
+                purge_done()
+                purged = time.monotonic()
+            if burst:
+                return processed
+            time.sleep(settings.JOBS_POLL_INTERVAL)
+            continue
+        run_job(job)
+        processed += 1
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов-воркеров.',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] == 1:
+            processed = work(options['burst'])
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=(options['burst'],))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
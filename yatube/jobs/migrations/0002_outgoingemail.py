@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:57
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Отправитель')),
+                ('recipients', models.TextField(verbose_name='Получатели (JSON)')),
+                ('message', models.BinaryField(verbose_name='Сообщение')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Отправить после')),
+                ('claim', models.CharField(blank=True, max_length=32, verbose_name='Захвачено пачкой')),
+                ('failed', models.BooleanField(default=False, verbose_name='Не отправлено')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+            ],
+            options={
+                'verbose_name': 'Письмо',
+                'verbose_name_plural': 'Исходящие письма',
+                'ordering': ['send_after', 'pk'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(fields=['failed', 'send_after'], name='outgoing_email_ready_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Отложенная задача в очереди на базе данных."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Аргументы (JSON)', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток',
+        default=3,
+    )
+    run_at = models.DateTimeField('Запустить после', default=timezone.now)
+    started = models.DateTimeField('Начата', null=True, blank=True)
+    idempotency_key = models.CharField(
+        'Ключ идемпотентности',
+        max_length=200,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Повторная постановка с тем же ключом не создаёт задачу',
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at']
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(
+                fields=['status', '-priority', 'run_at'],
+                name='job_claim_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку, готовое MIME-сообщение."""
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.TextField('Получатели (JSON)')
+    message = models.BinaryField('Сообщение')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    send_after = models.DateTimeField(
+        'Отправить после',
+        default=timezone.now,
+    )
+    claim = models.CharField('Захвачено пачкой', max_length=32, blank=True)
+    failed = models.BooleanField('Не отправлено', default=False)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        ordering = ['send_after', 'pk']
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['failed', 'send_after'],
+                name='outgoing_email_ready_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.from_email} -> {self.recipients}'
@@ -0,0 +1,127 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(name, kwargs=None, key=None, priority=None, delay=0):
+    """Ставит задачу в очередь и возвращает её.
+
+    Если задача с тем же ключом идемпотентности уже есть, новая не
+    создаётся и возвращается существующая.
+    """
+    task = get_task(name)
+    job = Job(
+        name=name,
+        payload=json.dumps(kwargs or {}),
+        priority=task.priority if priority is None else priority,
+        max_attempts=task.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        idempotency_key=key,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        if key is None:
+            raise
+        return Job.objects.get(idempotency_key=key)
+    if settings.JOBS_ALWAYS_EAGER:
+        transaction.on_commit(lambda: claim_and_run(job.pk))
+    return job
+
+
+def claim_next():
+    """Забирает самую приоритетную готовую задачу или возвращает None.
+
+    Захват - условный UPDATE, поэтому несколько воркеров не получат
+    одну задачу. Зависшие в RUNNING дольше JOBS_VISIBILITY_TIMEOUT
+    задачи снова считаются готовыми, если у них остались попытки, а
+    иначе помечаются FAILED: воркер, который падает на задаче, не
+    будет перезапускать её вечно.
+    """
+    now = timezone.now()
+    stale = Q(
+        status=Job.RUNNING,
+        started__lt=now - timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT),
+    )
+    Job.objects.filter(stale, attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        last_error='Воркер не завершил задачу за JOBS_VISIBILITY_TIMEOUT',
+    )
+    ready = Q(status=Job.QUEUED, run_at__lte=now) | stale & Q(
+        attempts__lt=F('max_attempts')
+    )
+    while True:
+        job = Job.objects.filter(ready).order_by(
+            '-priority', 'run_at', 'pk'
+        ).first()
+        if job is None:
+            return None
+        if _claim(job, now):
+            return job
+
+
+def claim_and_run(pk):
+    job = Job.objects.filter(pk=pk).first()
+    if job is not None and _claim(job, timezone.now()):
+        run_job(job)
+
+
+def _claim(job, now):
+    claimed = Job.objects.filter(
+        pk=job.pk, status=job.status, attempts=job.attempts
+    ).update(status=Job.RUNNING, started=now, attempts=F('attempts') + 1)
+    job.status = Job.RUNNING
+    job.attempts += 1
+    return bool(claimed)
+
+
+def run_job(job):
+    """Выполняет захваченную задачу и фиксирует результат."""
+    try:
+        get_task(job.name)(**json.loads(job.payload))
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', job)
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+        job.save(update_fields=('status', 'run_at', 'last_error'))
+        return False
+    if job.idempotency_key is None:
+        # Без ключа выполненная задача больше не нужна
+        job.delete()
+    else:
+        job.status = Job.DONE
+        job.save(update_fields=('status',))
+    return True
+
+
+def purge_done(now=None):
+    """Удаляет выполненные задачи старше JOBS_DONE_RETENTION секунд.
+
+    Выполненные задачи с ключом хранятся, чтобы повторная постановка
+    с тем же ключом не запускала их снова; дольше срока хранения ключ
+    не защищает. Возвращает число удалённых задач.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.JOBS_DONE_RETENTION)
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, started__lt=cutoff
+    ).delete()
+    return deleted
@@ -0,0 +1,28 @@
+from django.core.exceptions import ImproperlyConfigured
+
+_tasks = {}
+
+
+class Task:
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+
+def task(name, priority=0, max_attempts=3):
+    """Регистрирует функцию как фоновую задачу под именем name."""
+    def decorator(func):
+        if name in _tasks:
+            raise ImproperlyConfigured(f'Задача {name} уже объявлена')
+        _tasks[name] = Task(func, name, priority, max_attempts)
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _tasks[name]
@@ -0,0 +1,18 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from .mail import FLUSH_KEY, SEND_TASK, ready_emails, schedule, send_batch
+from .queue import enqueue
+from .registry import task
+
+
+@task(SEND_TASK, priority=1)
+def send_queued_email():
+    """Отправляет пачку писем из очереди и планирует следующую."""
+    # Письма, пришедшие во время отправки, поставят новую задачу
+    cache.delete(FLUSH_KEY)
+    _, retry_in = send_batch()
+    if ready_emails(timezone.now()).exists():
+        schedule()
+    if retry_in is not None:
+        enqueue(SEND_TASK, delay=retry_in)
@@ -0,0 +1,310 @@
+import json
+import socketserver
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .mail import FLUSH_KEY, SEND_TASK, _renew, claim_batch, send_batch
+from .models import Job, OutgoingEmail
+from .queue import claim_next, enqueue, purge_done, run_job
+from .registry import task
+
+calls = []
+
+
+@task('jobs.tests.record', priority=0, max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@task('jobs.tests.fail', max_attempts=2)
+def fail():
+    raise ValueError('boom')
+
+
+@override_settings(JOBS_ALWAYS_EAGER=False)
+class JobQueueTest(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_payload(self):
+        job = enqueue('jobs.tests.record', {'value': 1})
+        self.assertEqual(json.loads(job.payload), {'value': 1})
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_idempotency_key_deduplicates(self):
+        first = enqueue('jobs.tests.record', {'value': 1}, key='once')
+        second = enqueue('jobs.tests.record', {'value': 2}, key='once')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_higher_priority_runs_first(self):
+        enqueue('jobs.tests.record', {'value': 'low'})
+        enqueue('jobs.tests.record', {'value': 'high'}, priority=5)
+        while True:
+            job = claim_next()
+            if job is None:
+                break
+            run_job(job)
+        self.assertEqual(calls, ['high', 'low'])
+
+    def test_done_job_without_key_is_deleted(self):
+        enqueue('jobs.tests.record', {'value': 1})
+        run_job(claim_next())
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job = enqueue('jobs.tests.fail')
+        self.assertFalse(run_job(claim_next()))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('boom', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertFalse(run_job(claim_next()))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    @override_settings(JOBS_VISIBILITY_TIMEOUT=60)
+    def test_crashing_job_is_not_reclaimed_forever(self):
+        job = enqueue('jobs.tests.record', {'value': 1})
+        for _ in range(job.max_attempts):
+            # Воркер захватил задачу и упал, не дойдя до run_job
+            self.assertEqual(claim_next().pk, job.pk)
+            Job.objects.filter(pk=job.pk).update(
+                started=timezone.now() - timedelta(seconds=120)
+            )
+        self.assertIsNone(claim_next())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(calls, [])
+
+    @override_settings(JOBS_DONE_RETENTION=60)
+    def test_old_done_jobs_are_purged(self):
+        old = enqueue('jobs.tests.record', {'value': 1}, key='old')
+        run_job(claim_next())
+        fresh = enqueue('jobs.tests.record', {'value': 2}, key='fresh')
+        run_job(claim_next())
+        Job.objects.filter(pk=old.pk).update(
+            started=timezone.now() - timedelta(seconds=120)
+        )
+        self.assertEqual(purge_done(), 1)
+        self.assertEqual(
+            list(Job.objects.values_list('pk', flat=True)), [fresh.pk]
+        )
+
+
+class InterruptedBackend(locmem.EmailBackend):
+    """Воркер останавливается после первого письма пачки."""
+
+    def send_messages(self, messages):
+        if mail.outbox:
+            raise KeyboardInterrupt
+        return super().send_messages(messages)
+
+
+def run_commit_hooks():
+    """Выполняет колбэки on_commit: TestCase не фиксирует транзакцию."""
+    hooks, connection.run_on_commit = connection.run_on_commit, []
+    for _, hook in hooks:
+        hook()
+
+
+def run_all():
+    while True:
+        run_commit_hooks()
+        job = claim_next()
+        if job is None:
+            return
+        run_job(job)
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и запоминает их."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 sink')
+        while True:
+            line = self.rfile.readline().decode()
+            if not line:
+                return
+            verb = line.split(None, 1)[0].split(':')[0].upper()
+            if verb == 'RCPT' and any(
+                address in line for address in self.server.refused
+            ):
+                self.reply('550 refused')
+            elif verb == 'DATA':
+                self.reply('354 go ahead')
+                data = []
+                for data_line in iter(self.rfile.readline, b''):
+                    if data_line.rstrip(b'\r\n') == b'.':
+                        break
+                    data.append(data_line)
+                self.server.messages.append(b''.join(data))
+                self.reply('250 queued')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.connections = 0
+        self.messages = []
+        self.refused = set()
+
+
+@override_settings(
+    JOBS_ALWAYS_EAGER=False,
+    EMAIL_BACKEND='jobs.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class QueuedEmailTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_messages_wait_in_queue(self):
+        mail.send_mail('Тема', 'Текст', 'site@yatube.ru', ['a@yatube.ru'])
+        mail.send_mail('Тема', 'Текст', 'site@yatube.ru', ['b@yatube.ru'])
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+        run_commit_hooks()
+        # Для обоих писем - одна задача отправки
+        self.assertEqual(Job.objects.filter(name=SEND_TASK).count(), 1)
+        run_all()
+        self.assertEqual(
+            sorted(message.recipients()[0] for message in mail.outbox),
+            ['a@yatube.ru', 'b@yatube.ru'],
+        )
+        self.assertIn(
+            b'\r\n\r\n\xd0\xa2\xd0\xb5\xd0\xba\xd1\x81\xd1\x82',
+            mail.outbox[0].message().as_bytes(linesep='\r\n'),
+        )
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    @override_settings(EMAIL_BATCH_SIZE=2)
+    def test_large_queue_is_sent_in_batches(self):
+        mail.send_mass_mail([
+            ('Тема', 'Текст', 'site@yatube.ru', [f'{i}@yatube.ru'])
+            for i in range(5)
+        ])
+        run_all()
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_rolled_back_mail_is_not_scheduled(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                mail.send_mail(
+                    'Тема', 'Текст', 'site@yatube.ru', ['a@yatube.ru']
+                )
+                raise ValueError
+        run_commit_hooks()
+        self.assertIsNone(cache.get(FLUSH_KEY))
+        self.assertFalse(Job.objects.exists())
+        mail.send_mail('Тема', 'Текст', 'site@yatube.ru', ['b@yatube.ru'])
+        run_all()
+        self.assertEqual(mail.outbox[0].recipients(), ['b@yatube.ru'])
+
+    @override_settings(EMAIL_QUEUE_BACKEND='jobs.tests.InterruptedBackend')
+    def test_sent_messages_are_deleted_at_once(self):
+        mail.send_mass_mail([
+            ('Тема', 'Текст', 'site@yatube.ru', [f'{i}@yatube.ru'])
+            for i in range(3)
+        ])
+        with self.assertRaises(KeyboardInterrupt):
+            send_batch()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+
+    def test_expired_claim_is_not_sent_twice(self):
+        mail.send_mail('Тема', 'Текст', 'site@yatube.ru', ['a@yatube.ru'])
+        stale = claim_batch(timezone.now())
+        later = timezone.now() + timedelta(
+            seconds=settings.EMAIL_SEND_TIMEOUT + 1
+        )
+        fresh = claim_batch(later)
+        self.assertEqual([email.pk for email in fresh], [stale[0].pk])
+        # Первый воркер дошёл до письма после истечения захвата
+        self.assertFalse(_renew(stale[0]))
+        self.assertTrue(_renew(fresh[0]))
+
+    def test_password_reset_is_queued(self):
+        get_user_model().objects.create_user(
+            username='reader', email='reader@yatube.ru', password='secret'
+        )
+        response = self.client.post(
+            reverse('users:password_reset'), {'email': 'reader@yatube.ru'}
+        )
+        self.assertRedirects(response, reverse('users:password_reset_done'))
+        self.assertEqual(mail.outbox, [])
+        run_all()
+        self.assertEqual(mail.outbox[0].recipients(), ['reader@yatube.ru'])
+
+
+class SMTPDeliveryTest(TestCase):
+
+    def setUp(self):
+        self.sink = SMTPSink()
+        threading.Thread(target=self.sink.serve_forever, daemon=True).start()
+        self.addCleanup(self.sink.server_close)
+        self.addCleanup(self.sink.shutdown)
+        settings = override_settings(
+            EMAIL_BACKEND='jobs.mail.QueuedEmailBackend',
+            EMAIL_QUEUE_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.sink.server_address[1],
+            EMAIL_HOST_USER='',
+            EMAIL_MAX_ATTEMPTS=2,
+            JOBS_ALWAYS_EAGER=False,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def send(self, *recipients):
+        mail.send_mass_mail([
+            ('Тема', 'Текст', 'site@yatube.ru', [recipient])
+            for recipient in recipients
+        ])
+
+    def test_batch_uses_one_connection(self):
+        self.send('a@yatube.ru', 'b@yatube.ru', 'c@yatube.ru')
+        self.assertEqual(send_batch(), (3, None))
+        self.assertEqual(len(self.sink.messages), 3)
+        self.assertEqual(self.sink.connections, 1)
+
+    def test_refused_message_is_retried_then_failed(self):
+        self.sink.refused.add('bad@yatube.ru')
+        self.send('bad@yatube.ru', 'good@yatube.ru')
+        sent, retry_in = send_batch()
+        self.assertEqual(sent, 1)
+        self.assertIsNotNone(retry_in)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertFalse(email.failed)
+        self.assertIn('refused', email.last_error)
+        # До срока повтора письмо не отправляется
+        self.assertEqual(send_batch(), (0, None))
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        send_batch()
+        email.refresh_from_db()
+        self.assertTrue(email.failed)
+        self.assertEqual(len(self.sink.messages), 1)
@@ -4,6 +4,10 @@ import sys
 
 def main():
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    if sys.argv[1:2] == ['test']:
+        os.environ.setdefault('DJANGO_ENV', 'test')
+    # Как в yatube/wsgi.py: без подмены distutils из setuptools
+    os.environ.setdefault('SETUPTOOLS_USE_DISTUTILS', 'stdlib')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
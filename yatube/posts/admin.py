@@ -1,9 +1,33 @@
-from django.contrib import admin
+from core.paginator import EstimatedCountPaginator
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
 
 from .models import Comment, Follow, Group, Post
+from .services import move_posts
 
 
-class PostAdmin(admin.ModelAdmin):
+class GroupActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        queryset=Group.objects.all(),
+        required=False,
+        label='Группа',
+    )
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Список без полного COUNT(*) и без фильтров по всем значениям FK.
+
+    Связанные объекты выбираются через autocomplete/raw_id, а поиск
+    идёт по индексированному username.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+
+class PostAdmin(ScalableAdmin):
     list_display = (
         'pk',
         'text',
@@ -13,34 +37,80 @@ class PostAdmin(admin.ModelAdmin):
     )
     list_editable = ('group',)
     search_fields = ('text',)
+    # Фильтр по дате не строит запросов: варианты фиксированы,
+    # а выборка идёт по индексу pub_date
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
+    date_hierarchy = 'pub_date'
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author',)
+    action_form = GroupActionForm
+    actions = ('move_to_group', 'remove_from_group')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group':
+            # list_editable строит форму на каждую строку: список групп
+            # читается из базы один раз за запрос
+            if not hasattr(request, '_group_choices'):
+                request._group_choices = list(field.choices)
+            field.choices = request._group_choices
+        return field
+
+    def save_model(self, request, obj, form, change):
+        if change and set(form.changed_data) == {'group'}:
+            obj.save(update_fields=('group',))
+        else:
+            super().save_model(request, obj, form, change)
+
+    def move_to_group(self, request, queryset):
+        field = self.action_form.base_fields['group']
+        try:
+            group = field.clean(request.POST.get('group'))
+        except ValidationError:
+            group = None
+        if group is None:
+            self.message_user(
+                request, 'Выберите группу для переноса.', messages.ERROR
+            )
+            return
+        updated = move_posts(queryset, group)
+        self.message_user(
+            request, f'Перенесено в «{group}»: {updated}.'
+        )
+    move_to_group.short_description = 'Перенести в выбранную группу'
+
+    def remove_from_group(self, request, queryset):
+        updated = move_posts(queryset, None)
+        self.message_user(request, f'Убрано из групп: {updated}.')
+    remove_from_group.short_description = 'Убрать из групп'
 
 
 class GroupAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
-    list_filter = ('title',)
+    search_fields = ('^title', '=slug')
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdmin):
     list_display = (
         'post',
         'author',
         'text',
     )
-    search_fields = ('text', 'author')
-    list_filter = ('post', 'author')
-    empty_value_display = '-пусто-'
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    search_fields = ('text', '^author__username')
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(ScalableAdmin):
     list_display = (
         'user',
         'author',
     )
-    search_fields = ('user', 'author')
-    empty_value_display = '-пусто-'
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    search_fields = ('^user__username', '^author__username')
 
 
 admin.site.register(Post, PostAdmin)
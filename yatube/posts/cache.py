@@ -0,0 +1,117 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+
+from .feeds import feed_count
+from .models import Group, Post
+
+GROUP_KEY = 'group:slug:{}'
+# Лента группы хранится под текущей версией; смена версии сбрасывает
+# ленту, не трогая сам ключ
+GROUP_FEED_VERSION_KEY = 'group:{}:feed:version'
+GROUP_FEED_KEY = 'group:{}:feed:{}'
+
+
+def get_group(slug):
+    """Группа по slug из кеша, без запроса к базе на каждый показ."""
+    key = GROUP_KEY.format(slug)
+    group = cache.get(key)
+    if group is None:
+        group = get_object_or_404(Group, slug=slug)
+        cache.set(key, group, settings.GROUP_CACHE_TIMEOUT)
+    return group
+
+
+def forget_group(slug, group_id):
+    cache.delete(GROUP_KEY.format(slug))
+    invalidate_feeds([group_id])
+
+
+def _entry(post):
+    # Порядок записей совпадает с Post.Meta.ordering: новые первыми
+    return (-post.pub_date.timestamp(), -post.pk)
+
+
+def _load_feed(group_id):
+    """Первые GROUP_FEED_CACHE_SIZE постов группы в порядке ленты.
+
+    complete - в кеше лежат все посты группы, и её ленту целиком
+    можно отдавать без запросов к базе.
+    """
+    key = _feed_key(group_id)
+    feed = cache.get(key)
+    if feed is None:
+        size = settings.GROUP_FEED_CACHE_SIZE
+        posts = Post.objects.filter(group_id=group_id).only('pub_date')
+        entries = [_entry(post) for post in posts[:size + 1]]
+        feed = {'entries': entries[:size], 'complete': len(entries) <= size}
+        cache.set(key, feed, settings.GROUP_CACHE_TIMEOUT)
+    return feed
+
+
+def _feed_key(group_id):
+    version_key = GROUP_FEED_VERSION_KEY.format(group_id)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    return GROUP_FEED_KEY.format(group_id, version)
+
+
+def _new_versions(group_ids):
+    cache.set_many({
+        GROUP_FEED_VERSION_KEY.format(group_id): uuid.uuid4().hex
+        for group_id in group_ids
+    }, None)
+
+
+def invalidate_feeds(group_ids):
+    """Сбрасывает закешированные ленты групп.
+
+    Ленты не правятся на месте: чтение, правка и запись из двух
+    процессов сразу теряли бы одно из изменений. Вместо этого группа
+    получает новую версию ленты, и следующий показ соберёт ленту из
+    базы. Версия меняется ещё раз после фиксации транзакции: лента,
+    собранная до неё без нового поста, останется под старой версией.
+    """
+    group_ids = [group_id for group_id in group_ids if group_id is not None]
+    if not group_ids:
+        return
+    _new_versions(group_ids)
+    transaction.on_commit(lambda: _new_versions(group_ids))
+
+
+class GroupFeed:
+    """Лента группы для Paginator: страницы из закешированных id.
+
+    Страницы за пределами окна кеша читаются из базы как обычно.
+    """
+
+    def __init__(self, group):
+        self.group = group
+        self.queryset = group.posts.select_related('author', 'group')
+        self.ordered = True
+
+    def count(self):
+        feed = _load_feed(self.group.pk)
+        if feed['complete']:
+            return len(feed['entries'])
+        return feed_count('group', self.group.pk)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        feed = _load_feed(self.group.pk)
+        entries = feed['entries']
+        stop = index.stop if index.stop is not None else len(entries) + 1
+        if stop > len(entries) and not feed['complete']:
+            return list(self.queryset[index])
+        ids = [-entry[1] for entry in entries[index]]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,179 @@
+import atexit
+import logging
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Comment, Post, User
+from .trending import record_activity
+
+logger = logging.getLogger(__name__)
+
+# Есть ли пост и в какой он группе: (True, group_id) или (False, None)
+POST_KEY = 'post:{}:stub'
+# Ещё не записанные в базу комментарии пользователя к посту
+PENDING_KEY = 'comments:pending:{}:{}'
+
+
+def post_stub(post_id):
+    """(есть ли пост, id его группы) без загрузки самого поста."""
+    key = POST_KEY.format(post_id)
+    stub = cache.get(key)
+    if stub is None:
+        group = Post.objects.filter(pk=post_id).values_list(
+            'group_id', flat=True
+        )
+        stub = (True, group[0]) if group else (False, None)
+        cache.set(key, stub, settings.POST_STUB_CACHE_TIMEOUT)
+    return stub
+
+
+def remember_post(post_id, group_id):
+    cache.set(
+        POST_KEY.format(post_id), (True, group_id),
+        settings.POST_STUB_CACHE_TIMEOUT,
+    )
+
+
+def forget_stubs(post_ids):
+    """Сбрасывает сведения о постах, изменённых в обход save()."""
+    cache.delete_many([POST_KEY.format(post_id) for post_id in post_ids])
+
+
+def forget_post(post_id):
+    cache.set(
+        POST_KEY.format(post_id), (False, None),
+        settings.POST_STUB_CACHE_TIMEOUT,
+    )
+
+
+class CommentBuffer:
+    """Буфер отложенной записи комментариев этого процесса.
+
+    Комментарии пишутся в базу пачками через bulk_create: по
+    COMMENT_BATCH_SIZE штук или не позже чем через
+    COMMENT_FLUSH_INTERVAL секунд после первого в пачке. При
+    завершении процесса буфер сбрасывается; при аварийном падении
+    несохранённые комментарии теряются.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.comments = []
+        self.timer = None
+
+    def add(self, comment, token):
+        with self.lock:
+            self.comments.append((comment, token))
+            full = len(self.comments) >= settings.COMMENT_BATCH_SIZE
+            if not full and self.timer is None:
+                self.timer = threading.Timer(
+                    settings.COMMENT_FLUSH_INTERVAL, self.flush_in_thread
+                )
+                self.timer.daemon = True
+                self.timer.start()
+        if full:
+            self.flush()
+
+    def flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            # Соединение с базой у потока таймера своё
+            connection.close()
+
+    def flush(self):
+        """Записывает накопленное, возвращает число комментариев."""
+        with self.lock:
+            batch, self.comments = self.comments, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not batch:
+            return 0
+        try:
+            return write_batch([comment for comment, _ in batch])
+        except Exception:
+            # Ошибка записи пачки не должна ронять запрос, который
+            # случайно заполнил буфер
+            logger.exception('Comment batch of %d was lost', len(batch))
+            return 0
+        finally:
+            forget_pending(batch)
+
+
+def write_batch(comments):
+    """bulk_create без комментариев к удалённым постам и авторам."""
+    post_ids = {comment.post_id for comment in comments}
+    author_ids = {comment.author_id for comment in comments}
+    with transaction.atomic():
+        post_ids = set(Post.objects.filter(pk__in=post_ids).values_list(
+            'pk', flat=True
+        ))
+        author_ids = set(User.objects.filter(pk__in=author_ids).values_list(
+            'pk', flat=True
+        ))
+        comments = [
+            comment for comment in comments
+            if comment.post_id in post_ids and comment.author_id in author_ids
+        ]
+        Comment.objects.bulk_create(comments)
+    return len(comments)
+
+
+def remember_pending(comment, token):
+    key = PENDING_KEY.format(comment.post_id, comment.author_id)
+    pending = cache.get(key, [])
+    pending.append((token, comment.text, comment.pub_date))
+    cache.set(key, pending, settings.COMMENT_PENDING_TIMEOUT)
+
+
+def forget_pending(batch):
+    tokens = {}
+    for comment, token in batch:
+        key = PENDING_KEY.format(comment.post_id, comment.author_id)
+        tokens.setdefault(key, set()).add(token)
+    for key, written in tokens.items():
+        pending = [
+            item for item in cache.get(key, []) if item[0] not in written
+        ]
+        if pending:
+            cache.set(key, pending, settings.COMMENT_PENDING_TIMEOUT)
+        else:
+            cache.delete(key)
+
+
+def pending_comments(post_id, user):
+    """Ещё не записанные комментарии user к посту: он видит их сразу."""
+    if not user.is_authenticated:
+        return []
+    pending = cache.get(PENDING_KEY.format(post_id, user.pk), [])
+    return [
+        Comment(post_id=post_id, author=user, text=text, pub_date=pub_date)
+        for _, text, pub_date in pending
+    ]
+
+
+buffer = CommentBuffer()
+atexit.register(buffer.flush)
+
+
+def add_comment(comment, group_id):
+    """Принимает новый комментарий: сразу в базу или в буфер.
+
+    При COMMENT_WRITE_BEHIND комментарий пишется пачкой вместе с
+    другими, а до того показывается автору из кеша.
+    """
+    if not settings.COMMENT_WRITE_BEHIND:
+        comment.save()
+        return
+    comment.pub_date = timezone.now()
+    token = uuid.uuid4().hex
+    remember_pending(comment, token)
+    # Сигналы при bulk_create не срабатывают
+    record_activity('comment', comment.post_id, group_id)
+    buffer.add(comment, token)
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from jobs.queue import enqueue
+
+from .models import Post
+
+COUNT_KEY = 'feed_count:{}:{}'
+
+FEEDS = {
+    'index': lambda pk: Post.objects.all(),
+    'group': lambda pk: Post.objects.filter(group_id=pk),
+    'profile': lambda pk: Post.objects.filter(author_id=pk),
+    'follow': lambda pk: Post.objects.filter(author__following__user_id=pk),
+}
+
+
+def count_key(feed, pk=None):
+    return COUNT_KEY.format(feed, pk)
+
+
+def refresh_count(feed, pk=None):
+    """Считает точное число постов ленты и кладёт его в кеш."""
+    ttl = settings.FEED_COUNT_TTL[feed]
+    count = FEEDS[feed](pk).count()
+    cache.set(
+        count_key(feed, pk),
+        (count, time.time() + ttl),
+        ttl * settings.FEED_COUNT_STALE_FACTOR,
+    )
+    return count
+
+
+def feed_count(feed, pk=None):
+    """Число постов ленты из кеша.
+
+    Устаревшее через FEED_COUNT_TTL[feed] значение ещё отдаётся, а
+    точный пересчёт ставится фоновой задачей. COUNT(*) в запросе
+    выполняется, только если в кеше нет ничего.
+    """
+    key = count_key(feed, pk)
+    cached = cache.get(key)
+    if cached is None:
+        return refresh_count(feed, pk)
+    count, fresh_until = cached
+    if time.time() >= fresh_until and cache.add(
+        f'{key}:refreshing', True, settings.FEED_COUNT_TTL[feed]
+    ):
+        enqueue('posts.refresh_feed_count', {'feed': feed, 'pk': pk})
+    return count
+
+
+def invalidate_counts(*feeds):
+    """Сбрасывает счётчики лент, заданных парами (лента, id)."""
+    cache.delete_many([count_key(feed, pk) for feed, pk in feeds])
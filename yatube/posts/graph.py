@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+logger = logging.getLogger(__name__)
+
+# Номер последнего изменения подписок и сами изменения по номерам.
+# Каждый процесс держит свой граф и догоняет журнал при обращении;
+# пропал номер (сброс кеша) или запись журнала - граф строится заново.
+# Эпоха меняется, когда номера начинаются заново, и отличает снимки
+# с прежними номерами.
+VERSION_KEY = 'follow_graph:version'
+EPOCH_KEY = 'follow_graph:epoch'
+CHANGE_KEY = 'follow_graph:change:{}'
+# Тип элементов массивов: 64-битные id пользователей
+TYPECODE = 'q'
+SNAPSHOT_FORMAT = 'follow-graph/1'
+
+_graph = None
+# Догоняет журнал или перестраивает _graph один поток за раз
+_graph_lock = threading.RLock()
+# Сверен ли граф с журналом в текущем запросе
+_request = threading.local()
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def _add(index, key, value):
+    ids = index.setdefault(key, array(TYPECODE))
+    if not _contains(ids, value):
+        insort(ids, value)
+
+
+def _remove(index, key, value):
+    ids = index.get(key)
+    if ids is None:
+        return
+    position = bisect_left(ids, value)
+    if position < len(ids) and ids[position] == value:
+        del ids[position]
+        if not ids:
+            del index[key]
+
+
+def _intersection_size(first, second):
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(_contains(second, value) for value in first)
+
+
+class FollowGraph:
+    """Граф подписок в памяти: отсортированные массивы id по каждому
+    пользователю в обе стороны.
+
+    Проверка подписки - двоичный поиск, без запроса к базе.
+    """
+
+    def __init__(self, edges=(), version=0, epoch=None):
+        self.following = {}
+        self.followers = {}
+        self.version = version
+        self.epoch = epoch
+        for user_id, author_id in edges:
+            self.add(user_id, author_id)
+
+    @classmethod
+    def from_db(cls, version=0, epoch=None):
+        edges = Follow.objects.order_by('user_id', 'author_id').values_list(
+            'user_id', 'author_id'
+        )
+        return cls._from_sorted(edges.iterator(), version, epoch)
+
+    @classmethod
+    def _from_sorted(cls, edges, version, epoch):
+        graph = cls(version=version, epoch=epoch)
+        for user_id, author_id in edges:
+            # Пары идут по порядку: достаточно дописывать в конец
+            graph.following.setdefault(
+                user_id, array(TYPECODE)
+            ).append(author_id)
+            graph.followers.setdefault(author_id, []).append(user_id)
+        graph.followers = {
+            author_id: array(TYPECODE, sorted(ids))
+            for author_id, ids in graph.followers.items()
+        }
+        return graph
+
+    def add(self, user_id, author_id):
+        _add(self.following, user_id, author_id)
+        _add(self.followers, author_id, user_id)
+
+    def remove(self, user_id, author_id):
+        _remove(self.following, user_id, author_id)
+        _remove(self.followers, author_id, user_id)
+
+    def sync_user(self, user_id):
+        """Перечитывает из базы подписки одного пользователя."""
+        for author_id in self.following.get(user_id, ()):
+            _remove(self.followers, author_id, user_id)
+        self.following.pop(user_id, None)
+        authors = Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True
+        )
+        for author_id in authors:
+            self.add(user_id, author_id)
+
+    def apply(self, change):
+        operation, *args = change
+        getattr(self, operation)(*args)
+
+    def follows(self, user_id, author_id):
+        return _contains(self.following.get(user_id, ()), author_id)
+
+    def mutual_followers(self, user_id, author_id):
+        """Сколько авторов из подписок user_id подписаны на author_id."""
+        return _intersection_size(
+            self.following.get(user_id, ()),
+            self.followers.get(author_id, ()),
+        )
+
+    def suggestions(self, user_id, limit=5):
+        """Подписки подписок user_id, на которые он ещё не подписан.
+
+        Чем больше подписок ведут к автору, тем он выше в списке.
+        """
+        following = self.following.get(user_id, ())
+        counter = Counter()
+        for author_id in following:
+            counter.update(self.following.get(author_id, ()))
+        candidates = [
+            (count, author_id) for author_id, count in counter.items()
+            if author_id != user_id and not _contains(following, author_id)
+        ]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        return [author_id for _, author_id in candidates[:limit]]
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.following.values())
+
+    def dumps(self):
+        """Снимок графа: строка JSON с заголовком и массив пар id.
+
+        Формат не исполняет код при чтении, в отличие от pickle.
+        """
+        edges = array(TYPECODE)
+        for user_id in sorted(self.following):
+            for author_id in self.following[user_id]:
+                edges.extend((user_id, author_id))
+        header = {
+            'format': SNAPSHOT_FORMAT,
+            'epoch': self.epoch,
+            'version': self.version,
+            'byteorder': sys.byteorder,
+            'itemsize': edges.itemsize,
+            'edges': len(edges) // 2,
+        }
+        return json.dumps(header).encode() + b'\n' + edges.tobytes()
+
+    @classmethod
+    def loads(cls, data):
+        """Граф из снимка dumps; ValueError, если снимок испорчен."""
+        line, _, raw = data.partition(b'\n')
+        header = json.loads(line)
+        edges = array(TYPECODE)
+        if (
+            not isinstance(header, dict)
+            or header.get('format') != SNAPSHOT_FORMAT
+            or header.get('itemsize') != edges.itemsize
+            or not isinstance(header.get('version'), int)
+            or not isinstance(header.get('edges'), int)
+            or len(raw) != header['edges'] * 2 * edges.itemsize
+        ):
+            raise ValueError('Неизвестный формат снимка графа подписок')
+        edges.frombytes(raw)
+        if header.get('byteorder') != sys.byteorder:
+            edges.byteswap()
+        return cls._from_sorted(
+            zip(edges[::2], edges[1::2]), header['version'], header['epoch']
+        )
+
+
+def save_snapshot(graph, path):
+    with open(path, 'wb') as snapshot:
+        snapshot.write(graph.dumps())
+
+
+def journal():
+    """Эпоха и номер журнала изменений; начинает журнал, если его нет."""
+    state = cache.get_many([EPOCH_KEY, VERSION_KEY])
+    if VERSION_KEY not in state:
+        # Номера начнутся с нуля: снимки с прежними номерами не подходят
+        cache.set(EPOCH_KEY, uuid.uuid4().hex, None)
+        cache.add(VERSION_KEY, 0, None)
+        state = cache.get_many([EPOCH_KEY, VERSION_KEY])
+    elif EPOCH_KEY not in state:
+        cache.add(EPOCH_KEY, uuid.uuid4().hex, None)
+        state = cache.get_many([EPOCH_KEY, VERSION_KEY])
+    return state.get(EPOCH_KEY), state.get(VERSION_KEY, 0)
+
+
+def _catch_up(graph, epoch, version):
+    """Применяет к graph журнал до version.
+
+    False, если граф из другой эпохи или нужных записей журнала уже
+    нет: тогда граф надо строить заново.
+    """
+    if graph.epoch != epoch or graph.version > version:
+        return False
+    numbers = range(graph.version + 1, version + 1)
+    if not numbers:
+        return True
+    changes = cache.get_many([CHANGE_KEY.format(n) for n in numbers])
+    if len(changes) != len(numbers):
+        return False
+    for number in numbers:
+        graph.apply(changes[CHANGE_KEY.format(number)])
+    graph.version = version
+    return True
+
+
+def load_graph(epoch, version):
+    """Граф из снимка FOLLOW_GRAPH_SNAPSHOT, а если его нет - из базы.
+
+    Снимок подходит, если он из той же эпохи журнала и журнал ещё
+    хранит все изменения после него: их хватает, чтобы догнать базу
+    без чтения таблицы подписок.
+    """
+    path = settings.FOLLOW_GRAPH_SNAPSHOT
+    if path and os.path.exists(path):
+        with open(path, 'rb') as snapshot:
+            data = snapshot.read()
+        try:
+            graph = FollowGraph.loads(data)
+        except ValueError as error:
+            logger.warning('Снимок графа %s не прочитан: %s', path, error)
+        else:
+            if _catch_up(graph, epoch, version):
+                return graph
+    return FollowGraph.from_db(version, epoch)
+
+
+def start_request():
+    _request.active = True
+    _request.checked = False
+
+
+def finish_request():
+    _request.active = False
+    _request.checked = False
+
+
+def get_graph():
+    """Граф подписок этого процесса, догнавший журнал изменений.
+
+    В запросе журнал сверяется один раз, при первом обращении;
+    изменения самого запроса граф получает сразу в record_change.
+    Вне запросов (команды, задачи) сверка - при каждом обращении.
+    """
+    global _graph
+    graph = _graph
+    if graph is not None and getattr(_request, 'checked', False):
+        return graph
+    with _graph_lock:
+        epoch, version = journal()
+        if _graph is None or not _catch_up(_graph, epoch, version):
+            _graph = load_graph(epoch, version)
+        _request.checked = getattr(_request, 'active', False)
+        return _graph
+
+
+def record_change(operation, *args):
+    """Записывает изменение подписок в журнал для всех процессов.
+
+    operation - метод FollowGraph: 'add', 'remove' или 'sync_user'.
+    Граф этого процесса догоняет журнал сразу: в запросе он сверен
+    заранее и иначе не увидел бы своё же изменение.
+    """
+    global _graph
+    try:
+        number = cache.incr(VERSION_KEY)
+    except ValueError:
+        # Номера нет: журнал начнётся заново, а граф этого процесса,
+        # уже сверенный в запросе, не знает об изменении
+        with _graph_lock:
+            _graph = None
+        return
+    cache.set(
+        CHANGE_KEY.format(number),
+        (operation, *args),
+        settings.FOLLOW_GRAPH_LOG_TIMEOUT,
+    )
+    with _graph_lock:
+        if _graph is not None and not _catch_up(
+            _graph, _graph.epoch, number
+        ):
+            _graph = None
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации авторов для всех читателей. '
+        'Запускается по расписанию, например раз в час из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k', type=int, default=settings.RECOMMENDATIONS_PER_USER
+        )
+        parser.add_argument(
+            '--half-life', type=float,
+            default=settings.RECOMMENDATIONS_HALF_LIFE_DAYS,
+            help='За сколько дней вес поста автора падает вдвое.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.RECOMMENDATIONS_CHUNK_SIZE,
+            help='Сколько читателей оценивать за раз.',
+        )
+
+    def handle(self, *args, **options):
+        if not recommendations.available():
+            raise CommandError(
+                'Для рекомендаций нужны numpy и scipy: '
+                'pip install -r requirements-recommendations.txt'
+            )
+        started = time.perf_counter()
+        result = recommendations.compute(
+            options['top_k'], options['half_life'],
+            chunk_size=options['chunk_size'],
+        )
+        computed = time.perf_counter()
+        stored = recommendations.store(result)
+        self.stdout.write(
+            f'{len(result)} читателей, {stored} рекомендаций: расчёт '
+            f'{(computed - started) * 1000:.1f} мс, запись '
+            f'{(time.perf_counter() - computed) * 1000:.1f} мс'
+        )
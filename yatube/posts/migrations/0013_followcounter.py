@@ -0,0 +1,135 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Счётчики FollowCounter ведут триггеры: так они верны для любых записей
+# в posts_follow - через ORM, сырой SQL и каскадное удаление, - а
+# увеличение счётчика входит в тот же оператор, что и сама подписка.
+SQLITE_TRIGGERS = [
+    '''
+    CREATE TRIGGER posts_follow_counter_insert
+    AFTER INSERT ON posts_follow
+    BEGIN
+        INSERT OR IGNORE INTO posts_followcounter
+            (user_id, followers, following)
+        VALUES (NEW.author_id, 0, 0), (NEW.user_id, 0, 0);
+        UPDATE posts_followcounter SET followers = followers + 1
+        WHERE user_id = NEW.author_id;
+        UPDATE posts_followcounter SET following = following + 1
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER posts_follow_counter_delete
+    AFTER DELETE ON posts_follow
+    BEGIN
+        UPDATE posts_followcounter SET followers = followers - 1
+        WHERE user_id = OLD.author_id;
+        UPDATE posts_followcounter SET following = following - 1
+        WHERE user_id = OLD.user_id;
+    END
+    ''',
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS posts_follow_counter_insert',
+    'DROP TRIGGER IF EXISTS posts_follow_counter_delete',
+]
+
+POSTGRESQL_TRIGGERS = [
+    '''
+    CREATE FUNCTION posts_follow_counter() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO posts_followcounter (user_id, followers, following)
+            VALUES (NEW.author_id, 1, 0)
+            ON CONFLICT (user_id) DO UPDATE
+            SET followers = posts_followcounter.followers + 1;
+            INSERT INTO posts_followcounter (user_id, followers, following)
+            VALUES (NEW.user_id, 0, 1)
+            ON CONFLICT (user_id) DO UPDATE
+            SET following = posts_followcounter.following + 1;
+            RETURN NEW;
+        END IF;
+        UPDATE posts_followcounter SET followers = followers - 1
+        WHERE user_id = OLD.author_id;
+        UPDATE posts_followcounter SET following = following - 1
+        WHERE user_id = OLD.user_id;
+        RETURN OLD;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER posts_follow_counter
+    AFTER INSERT OR DELETE ON posts_follow
+    FOR EACH ROW EXECUTE PROCEDURE posts_follow_counter()
+    ''',
+]
+POSTGRESQL_DROP = [
+    'DROP TRIGGER IF EXISTS posts_follow_counter ON posts_follow',
+    'DROP FUNCTION IF EXISTS posts_follow_counter()',
+]
+
+TRIGGERS = {
+    'sqlite': (SQLITE_TRIGGERS, SQLITE_DROP),
+    'postgresql': (POSTGRESQL_TRIGGERS, POSTGRESQL_DROP),
+}
+
+# Начальные значения для уже существующих подписок
+BACKFILL = '''
+    INSERT INTO posts_followcounter (user_id, followers, following)
+    SELECT ids.id,
+        (SELECT COUNT(*) FROM posts_follow WHERE author_id = ids.id),
+        (SELECT COUNT(*) FROM posts_follow WHERE user_id = ids.id)
+    FROM (
+        SELECT user_id AS id FROM posts_follow
+        UNION
+        SELECT author_id FROM posts_follow
+    ) AS ids
+'''
+
+
+def get_triggers(schema_editor):
+    # На других базах триггеров нет: счётчики тогда считаются
+    # запросами COUNT (posts.services.follow_counts, проверка core.W011)
+    return TRIGGERS.get(schema_editor.connection.vendor, ([], []))
+
+
+def create_triggers(apps, schema_editor):
+    create, _ = get_triggers(schema_editor)
+    if not create:
+        return
+    for statement in create:
+        schema_editor.execute(statement)
+    schema_editor.execute(BACKFILL)
+
+
+def drop_triggers(apps, schema_editor):
+    _, drop = get_triggers(schema_editor)
+    for statement in drop:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0012_post_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('followers', models.PositiveIntegerField(default=0, verbose_name='Подписчики')),
+                ('following', models.PositiveIntegerField(default=0, verbose_name='Подписки')),
+            ],
+            options={
+                'verbose_name': 'Счётчик подписок',
+                'verbose_name_plural': 'Счётчики подписок',
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
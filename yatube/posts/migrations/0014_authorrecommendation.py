@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0013_followcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorRecommendation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Рекомендация автора',
+                'verbose_name_plural': 'Рекомендации авторов',
+                'ordering': ('-score',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='authorrecommendation',
+            index=models.Index(fields=['user', '-score'], name='posts_autho_user_id_84e17f_idx'),
+        ),
+    ]
@@ -23,7 +23,7 @@ class Post(CreatedModel):
         verbose_name='Текст',
         help_text='Отредактируйте или введите новый текст'
     )
-    pub_date = models.DateTimeField(auto_now_add=True)
+    pub_date = models.DateTimeField(auto_now_add=True, db_index=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -95,3 +95,51 @@ class Follow(models.Model):
                 name='unique_follow'
             )
         ]
+
+
+class FollowCounter(models.Model):
+    """Число подписчиков и подписок пользователя.
+
+    Ведётся триггерами на posts_follow (миграция 0013), поэтому верно
+    и для записей в обход ORM, и при параллельных подписках. Триггеры
+    есть только для баз TRIGGER_VENDORS; на других таблица пуста, и
+    services.follow_counts считает подписки запросами COUNT.
+    """
+    TRIGGER_VENDORS = ('sqlite', 'postgresql')
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_counter'
+    )
+    followers = models.PositiveIntegerField('Подписчики', default=0)
+    following = models.PositiveIntegerField('Подписки', default=0)
+
+    class Meta:
+        verbose_name = 'Счётчик подписок'
+        verbose_name_plural = 'Счётчики подписок'
+
+
+class AuthorRecommendation(models.Model):
+    """Автор, которого стоит предложить пользователю.
+
+    Таблицу целиком пересчитывает команда compute_recommendations.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Рекомендация автора'
+        verbose_name_plural = 'Рекомендации авторов'
+        ordering = ('-score',)
+        indexes = [models.Index(fields=['user', '-score'])]
@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AuthorRecommendation, Follow, Post
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+# Вес пути «подписки моих подписок» и пути «на кого подписаны те, у
+# кого общие со мной подписки»
+FRIENDS_OF_FRIENDS_WEIGHT = 1.0
+CO_FOLLOWERS_WEIGHT = 0.5
+
+
+def available():
+    return np is not None
+
+
+def author_activity(author_index, size, half_life_days, now):
+    """Активность авторов: посты с весом, затухающим вдвое каждые
+    half_life_days дней, в масштабе log1p.
+    """
+    authors, dates = [], []
+    for author_id, pub_date in Post.objects.values_list(
+        'author_id', 'pub_date'
+    ).iterator():
+        if author_id in author_index:
+            authors.append(author_index[author_id])
+            dates.append(pub_date.timestamp())
+    if not authors:
+        return np.zeros(size)
+    age_days = (now.timestamp() - np.array(dates)) / 86400
+    weights = np.exp2(-np.maximum(age_days, 0) / half_life_days)
+    return np.log1p(np.bincount(authors, weights=weights, minlength=size))
+
+
+def author_weights(follows):
+    """Вес общего автора в сходстве читателей, в духе IDF: общий
+    популярный автор говорит о схожести вкусов меньше, чем редкий.
+    """
+    readers = np.diff(follows.indptr) > 0
+    followers = np.bincount(follows.indices, minlength=follows.shape[1])
+    return np.log((1 + readers.sum()) / (1 + followers)) + 1
+
+
+def score_matrix(follows, activity, weights, start=0, stop=None):
+    """Оценки кандидатов: строки - читатели start..stop, столбцы - авторы.
+
+    follows - разреженная матрица подписок (follows[u, a] = 1).
+    Сходство считается только для этих читателей: матрица «читатель -
+    читатель» по всем сразу почти плотная и не помещается в память.
+    Уже существующие подписки и сам читатель из оценок исключены.
+    """
+    readers = follows[start:stop]
+    # Сходство читателя с самим собой попадает только в его подписки,
+    # а они ниже всё равно исключаются
+    similar = readers @ sparse.diags(weights) @ follows.T
+    scores = (
+        FRIENDS_OF_FRIENDS_WEIGHT * (readers @ follows)
+        + CO_FOLLOWERS_WEIGHT * (similar @ follows)
+    )
+    scores = sparse.csr_matrix(scores @ sparse.diags(activity))
+    rows = np.arange(readers.shape[0])
+    own = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, rows + start)), shape=scores.shape
+    )
+    scores = scores - scores.multiply(readers) - scores.multiply(own)
+    scores.eliminate_zeros()
+    return scores
+
+
+def top_k(scores, k):
+    """Для каждой строки: индексы и оценки k лучших столбцов."""
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        if start == end:
+            continue
+        data = scores.data[start:end]
+        columns = scores.indices[start:end]
+        if len(data) > k:
+            best = np.argpartition(-data, k - 1)[:k]
+            data, columns = data[best], columns[best]
+        order = np.lexsort((columns, -data))
+        yield row, columns[order], data[order]
+
+
+def compute(k, half_life_days, now=None, chunk_size=1000):
+    """Рекомендации для всех читателей: {user_id: [(author_id, оценка)]}.
+
+    Граф подписок и активность авторов обрабатываются разреженными
+    матрицами, без запросов по каждому пользователю; оценки - блоками
+    по chunk_size читателей, чтобы память не росла квадратично.
+    """
+    if not available():
+        raise ImportError('Для рекомендаций нужны numpy и scipy.')
+    edges = np.array(
+        list(Follow.objects.values_list('user_id', 'author_id').iterator()),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    if not len(edges):
+        return {}
+    ids, positions = np.unique(edges, return_inverse=True)
+    positions = positions.reshape(-1, 2)
+    size = len(ids)
+    follows = sparse.csr_matrix(
+        (np.ones(len(edges)), (positions[:, 0], positions[:, 1])),
+        shape=(size, size),
+    )
+    author_index = {int(pk): index for index, pk in enumerate(ids)}
+    activity = author_activity(
+        author_index, size, half_life_days, now or timezone.now()
+    )
+    weights = author_weights(follows)
+    result = {}
+    for start in range(0, size, chunk_size):
+        scores = score_matrix(
+            follows, activity, weights, start, start + chunk_size
+        )
+        for row, columns, values in top_k(scores, k):
+            result[int(ids[start + row])] = [
+                (int(ids[column]), float(score))
+                for column, score in zip(columns, values)
+            ]
+    return result
+
+
+@transaction.atomic
+def store(recommendations):
+    """Заменяет таблицу рекомендаций новыми, возвращает число строк."""
+    AuthorRecommendation.objects.all().delete()
+    rows = [
+        AuthorRecommendation(user_id=user_id, author_id=author_id, score=score)
+        for user_id, authors in recommendations.items()
+        for author_id, score in authors
+    ]
+    AuthorRecommendation.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
@@ -0,0 +1,162 @@
+from django.conf import settings
+from django.db import connections, router
+
+from .feeds import invalidate_counts
+from .graph import get_graph, record_change
+from .models import (AuthorRecommendation, Follow, FollowCounter, Post,
+                     User)
+from .signals import posts_regrouped
+
+# Вставка без ошибки на уже существующую подписку (unique_follow):
+# один оператор вместо SELECT и INSERT из get_or_create
+INSERT_IGNORE = {
+    'sqlite': 'INSERT OR IGNORE INTO {table} (user_id, author_id) {rows}',
+}
+INSERT_IGNORE_DEFAULT = (
+    'INSERT INTO {table} (user_id, author_id) {rows} ON CONFLICT DO NOTHING'
+)
+
+
+def move_posts(queryset, group):
+    """Переносит посты в группу одним UPDATE; group=None - убрать из групп.
+
+    Сигналы моделей при этом не срабатывают, поэтому кеши затронутых
+    групп и постов сбрасываются одним пакетом через posts_regrouped.
+    """
+    rows = list(queryset.order_by().values_list('pk', 'group_id'))
+    updated = queryset.update(group=group)
+    group_ids = {group_id for _, group_id in rows}
+    if group is not None:
+        group_ids.add(group.pk)
+    group_ids.discard(None)
+    posts_regrouped.send(
+        sender=Post, group_ids=group_ids, post_ids=[pk for pk, _ in rows]
+    )
+    return updated
+
+
+def is_following(user, author_id):
+    """Подписан ли user на автора с id author_id, без запроса к базе."""
+    return user.is_authenticated and get_graph().follows(user.pk, author_id)
+
+
+def mutual_followers(user, author_id):
+    """Сколько авторов из подписок user подписаны на author_id."""
+    if not user.is_authenticated:
+        return 0
+    return get_graph().mutual_followers(user.pk, author_id)
+
+
+def suggested_author_ids(user, limit=5):
+    """id авторов, на которых подписаны подписки user."""
+    if not user.is_authenticated:
+        return []
+    return get_graph().suggestions(user.pk, limit)
+
+
+def recommended_authors(user, limit=None):
+    """Кого почитать: рекомендации из compute_recommendations.
+
+    Авторы, на которых user подписался после расчёта, пропускаются.
+    Пока рекомендаций нет (новый читатель), предлагаются подписки
+    его подписок по графу в памяти.
+    """
+    if not user.is_authenticated:
+        return []
+    limit = limit or settings.RECOMMENDATIONS_SHOWN
+    graph = get_graph()
+    rows = AuthorRecommendation.objects.filter(user=user).select_related(
+        'author'
+    )
+    authors = [
+        row.author for row in rows
+        if not graph.follows(user.pk, row.author_id)
+    ][:limit]
+    if authors:
+        return authors
+    ids = graph.suggestions(user.pk, limit)
+    by_id = User.objects.in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def _execute(sql, params):
+    """Выполняет запрос на запись, возвращает число затронутых строк."""
+    connection = connections[router.db_for_write(Follow)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _insert_follows(rows, params):
+    """Вставляет подписки из rows (VALUES или SELECT), пропуская дубли."""
+    vendor = connections[router.db_for_write(Follow)].vendor
+    sql = INSERT_IGNORE.get(vendor, INSERT_IGNORE_DEFAULT)
+    return _execute(
+        sql.format(table=Follow._meta.db_table, rows=rows), params
+    )
+
+
+def _follows_changed(user):
+    # Запись идёт в обход сигналов Follow
+    invalidate_counts(('follow', user.pk))
+
+
+def follow(user, author):
+    """Подписывает user на author одним запросом.
+
+    Повторная подписка ничего не меняет, на себя подписаться нельзя.
+    Возвращает True, если подписка появилась.
+    """
+    if user.pk == author.pk:
+        return False
+    created = _insert_follows('VALUES (%s, %s)', [user.pk, author.pk])
+    if created:
+        _follows_changed(user)
+        record_change('add', user.pk, author.pk)
+    return bool(created)
+
+
+def unfollow(user, author):
+    """Отписывает user от author одним запросом.
+
+    Возвращает True, если подписка была.
+    """
+    deleted = _execute(
+        f'DELETE FROM {Follow._meta.db_table} '
+        'WHERE user_id = %s AND author_id = %s',
+        [user.pk, author.pk],
+    )
+    if deleted:
+        _follows_changed(user)
+        record_change('remove', user.pk, author.pk)
+    return bool(deleted)
+
+
+def follow_group_authors(user, group):
+    """Подписывает user на всех авторов постов группы одним запросом.
+
+    Возвращает число новых подписок.
+    """
+    created = _insert_follows(
+        f'SELECT DISTINCT %s, author_id FROM {Post._meta.db_table} '
+        'WHERE group_id = %s AND author_id <> %s',
+        [user.pk, group.pk, user.pk],
+    )
+    if created:
+        _follows_changed(user)
+        record_change('sync_user', user.pk)
+    return created
+
+
+def follow_counts(user_id):
+    """Число подписчиков и подписок пользователя."""
+    vendor = connections[router.db_for_read(FollowCounter)].vendor
+    if vendor not in FollowCounter.TRIGGER_VENDORS:
+        return (
+            Follow.objects.filter(author_id=user_id).count(),
+            Follow.objects.filter(user_id=user_id).count(),
+        )
+    counts = FollowCounter.objects.filter(user_id=user_id).values_list(
+        'followers', 'following'
+    ).first()
+    return counts or (0, 0)
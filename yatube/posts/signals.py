@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+from jobs.queue import enqueue
+
+from .cache import forget_group, invalidate_feeds
+from .comments import forget_post, forget_stubs, post_stub, remember_post
+from .feeds import invalidate_counts
+from .graph import finish_request, record_change, start_request
+from .models import Comment, Follow, Group, Post
+from .trending import forget, record_activity
+
+User = get_user_model()
+
+# Посты массово перенесены между группами в обход save()
+posts_regrouped = Signal(providing_args=['group_ids', 'post_ids'])
+
+
+def invalidate_post_counts(post):
+    feeds = [('index', None), ('profile', post.author_id)]
+    if post.group_id is not None:
+        feeds.append(('group', post.group_id))
+    invalidate_counts(*feeds)
+    enqueue('posts.invalidate_follow_counts', {'author_id': post.author_id})
+
+
+@receiver(post_init, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    # __dict__, чтобы не загружать отложенное поле лишним запросом
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Post)
+def update_group_feeds(sender, instance, created, **kwargs):
+    remember_post(instance.pk, instance.group_id)
+    if created:
+        invalidate_post_counts(instance)
+        record_activity('post', instance.pk, instance.group_id)
+    old_group_id = instance._loaded_group_id
+    new_group_id = instance.group_id
+    if not created and old_group_id == new_group_id:
+        return
+    if old_group_id is not None and not created:
+        invalidate_feeds([old_group_id])
+        invalidate_counts(('group', old_group_id))
+    if new_group_id is not None:
+        invalidate_feeds([new_group_id])
+        invalidate_counts(('group', new_group_id))
+    instance._loaded_group_id = new_group_id
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_group_feed(sender, instance, **kwargs):
+    invalidate_feeds([instance.group_id])
+    invalidate_post_counts(instance)
+    forget('post', instance.pk)
+    forget_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_activity(sender, instance, created, **kwargs):
+    if created:
+        _, group_id = post_stub(instance.post_id)
+        record_activity('comment', instance.post_id, group_id)
+
+
+@receiver(post_init, sender=Group)
+def remember_group_slug(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_cached_group(sender, instance, **kwargs):
+    forget_group(instance.slug, instance.pk)
+    if instance._loaded_slug and instance._loaded_slug != instance.slug:
+        forget_group(instance._loaded_slug, instance.pk)
+    invalidate_counts(('group', instance.pk))
+
+
+@receiver(post_delete, sender=Group)
+def forget_trending_group(sender, instance, **kwargs):
+    forget('group', instance.pk)
+
+
+@receiver(posts_regrouped)
+def invalidate_regrouped_feeds(sender, group_ids, **kwargs):
+    invalidate_feeds(group_ids)
+    invalidate_counts(*(('group', group_id) for group_id in group_ids))
+
+
+@receiver(posts_regrouped)
+def forget_regrouped_posts(sender, post_ids=(), **kwargs):
+    # Иначе комментарии к перенесённым постам засчитывались бы в
+    # популярное прежней группы
+    forget_stubs(post_ids)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_count(sender, instance, **kwargs):
+    invalidate_counts(('follow', instance.user_id))
+
+
+@receiver(post_save, sender=Follow)
+def add_follow_to_graph(sender, instance, created, **kwargs):
+    if created:
+        record_change('add', instance.user_id, instance.author_id)
+    else:
+        record_change('sync_user', instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_follow_from_graph(sender, instance, **kwargs):
+    record_change('remove', instance.user_id, instance.author_id)
+
+
+@receiver(request_started)
+def check_graph_once(sender, **kwargs):
+    start_request()
+
+
+@receiver(request_finished)
+def forget_graph_check(sender, **kwargs):
+    finish_request()
+
+
+@receiver(post_save, sender=User)
+def forget_reused_user_id(sender, instance, created, **kwargs):
+    # SQLite может выдать id удалённого пользователя новому:
+    # закешированные счётчики старого владельца id ему не подходят
+    if created:
+        invalidate_counts(('profile', instance.pk), ('follow', instance.pk))
@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from jobs.registry import task
+
+from .feeds import count_key, invalidate_counts, refresh_count
+from .models import Follow, Post
+
+# Миниатюра карточки поста, как в шаблонах posts/
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+@task('posts.warm_thumbnail', priority=-1)
+def warm_thumbnail(post_id):
+    """Заранее готовит миниатюру, чтобы её не строила первая лента."""
+    from sorl.thumbnail import get_thumbnail
+
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image:
+        get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+@task('posts.refresh_feed_count')
+def refresh_feed_count(feed, pk):
+    refresh_count(feed, pk)
+    cache.delete(f'{count_key(feed, pk)}:refreshing')
+
+
+@task('posts.invalidate_follow_counts')
+def invalidate_follow_counts(author_id):
+    """Сбрасывает счётчики лент подписок всех подписчиков автора."""
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )
+    invalidate_counts(*(('follow', user_id) for user_id in followers))
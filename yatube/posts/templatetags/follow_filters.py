@@ -0,0 +1,21 @@
+from django import template
+
+from ..services import (is_following, mutual_followers,
+                        recommended_authors)
+
+register = template.Library()
+
+
+@register.filter
+def follows(user, author_id):
+    return is_following(user, author_id)
+
+
+@register.filter(name='mutual_followers')
+def mutual_followers_filter(user, author_id):
+    return mutual_followers(user, author_id)
+
+
+@register.filter(name='recommended_authors')
+def recommended_authors_filter(user):
+    return recommended_authors(user)
@@ -0,0 +1,151 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..cache import GroupFeed
+from ..comments import post_stub
+from ..models import Comment, Follow, Group, Post
+from ..services import move_posts
+
+User = get_user_model()
+
+
+class PostBulkMoveTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.source = Group.objects.create(
+            title='source', slug='source', description='source'
+        )
+        self.target = Group.objects.create(
+            title='target', slug='target', description='target'
+        )
+        self.posts = [
+            Post.objects.create(author=self.admin, text=f'Пост {i}',
+                                group=self.source)
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_move_posts_is_one_update(self):
+        with self.assertNumQueries(2):
+            updated = move_posts(Post.objects.all(), self.target)
+        self.assertEqual(updated, 3)
+        self.assertEqual(self.target.posts.count(), 3)
+
+    def test_move_posts_invalidates_group_feeds(self):
+        self.assertEqual(GroupFeed(self.source).count(), 3)
+        self.assertEqual(GroupFeed(self.target).count(), 0)
+        move_posts(Post.objects.all(), self.target)
+        self.assertEqual(GroupFeed(self.source).count(), 0)
+        self.assertEqual(GroupFeed(self.target).count(), 3)
+
+    def test_move_posts_refreshes_post_groups(self):
+        post = self.posts[0]
+        post_stub(post.pk)
+        move_posts(Post.objects.filter(pk=post.pk), self.target)
+        self.assertEqual(post_stub(post.pk), (True, self.target.pk))
+
+    def test_move_to_group_action(self):
+        self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'action': 'move_to_group',
+                'group': self.target.pk,
+                '_selected_action': [post.pk for post in self.posts[:2]],
+            },
+        )
+        self.assertEqual(self.target.posts.count(), 2)
+
+    def test_remove_from_group_action(self):
+        self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {
+                'action': 'remove_from_group',
+                '_selected_action': [self.posts[0].pk],
+            },
+        )
+        self.assertEqual(self.source.posts.count(), 2)
+
+    def test_changelist_opens(self):
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+
+class ScalableAdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.group = Group.objects.create(
+            title='group', slug='group', description='group'
+        )
+
+    def add_rows(self, number, prefix='user'):
+        for i in range(number):
+            user = User.objects.create_user(username=f'{prefix}_{i}')
+            post = Post.objects.create(
+                author=user, text=f'Пост {i}', group=self.group
+            )
+            Comment.objects.create(post=post, author=user, text='Текст')
+            Follow.objects.create(user=user, author=self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        urls = [
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_comment_changelist'),
+            reverse('admin:posts_follow_changelist'),
+        ]
+        self.add_rows(1, prefix='first')
+        # Первый запрос кладёт пользователя в кеш (core.auth)
+        self.client.get(urls[0])
+        before = [self.count_queries(url) for url in urls]
+        self.add_rows(5, prefix='more')
+        after = [self.count_queries(url) for url in urls]
+        self.assertEqual(before, after)
+
+    def test_follow_search_by_username(self):
+        self.add_rows(2)
+        response = self.client.get(
+            reverse('admin:posts_follow_changelist'), {'q': 'user_1'}
+        )
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+
+    def test_user_search(self):
+        User.objects.create_user(username='reader', email='mail@yatube.ru')
+        changelist = reverse(
+            f'admin:{User._meta.app_label}_user_changelist'
+        )
+        response = self.client.get(changelist, {'q': 'mail@yatube'})
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+        autocomplete = reverse(
+            f'admin:{User._meta.app_label}_user_autocomplete'
+        )
+        found = self.client.get(autocomplete, {'term': 'rea'}).json()
+        self.assertEqual(
+            [item['text'] for item in found['results']], ['reader']
+        )
+        # Автодополнение ищет только по началу username
+        self.assertEqual(
+            self.client.get(autocomplete, {'term': 'mail'}).json()['results'],
+            [],
+        )
@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase, override_settings
+
+from ..cache import GroupFeed, _feed_key, get_group
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(GROUP_FEED_CACHE_SIZE=5)
+class GroupCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user_test')
+        self.group = Group.objects.create(
+            title='test group',
+            slug='test-slug',
+            description='test description',
+        )
+        self.other_group = Group.objects.create(
+            title='other group',
+            slug='other-slug',
+            description='other description',
+        )
+        self.posts = [
+            Post.objects.create(
+                author=self.user, text=f'Пост {i}', group=self.group
+            )
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        cache.clear()
+
+    def feed_ids(self, group):
+        return [post.pk for post in GroupFeed(group)[0:10]]
+
+    def test_group_lookup_is_cached(self):
+        get_group(self.group.slug)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group(self.group.slug), self.group)
+
+    def test_unknown_slug_raises_404(self):
+        with self.assertRaises(Http404):
+            get_group('missing')
+
+    def test_renamed_group_is_forgotten(self):
+        get_group(self.group.slug)
+        self.group.slug = 'new-slug'
+        self.group.save()
+        with self.assertRaises(Http404):
+            get_group('test-slug')
+        self.assertEqual(get_group('new-slug'), self.group)
+
+    def test_complete_feed_is_counted_without_queries(self):
+        feed = GroupFeed(self.group)
+        feed.count()
+        with self.assertNumQueries(0):
+            self.assertEqual(feed.count(), 3)
+
+    def test_new_post_is_added_to_cached_feed(self):
+        self.feed_ids(self.group)
+        post = Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        self.assertEqual(self.feed_ids(self.group)[0], post.pk)
+
+    def test_late_stale_feed_is_not_served(self):
+        # Параллельный показ взял версию ленты до нового поста, а
+        # собранную без него ленту записал уже после
+        stale_key = _feed_key(self.group.pk)
+        post = Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        cache.set(stale_key, {'entries': [], 'complete': True})
+        self.assertEqual(self.feed_ids(self.group)[0], post.pk)
+
+    def test_moved_post_changes_feeds(self):
+        self.feed_ids(self.group)
+        self.feed_ids(self.other_group)
+        post = self.posts[0]
+        post.group = self.other_group
+        post.save()
+        self.assertNotIn(post.pk, self.feed_ids(self.group))
+        self.assertEqual(self.feed_ids(self.other_group), [post.pk])
+
+    def test_deleted_post_leaves_feed(self):
+        self.feed_ids(self.group)
+        post = self.posts[1]
+        post.delete()
+        self.assertNotIn(post.pk, self.feed_ids(self.group))
+        self.assertEqual(GroupFeed(self.group).count(), 2)
+
+    def test_pages_beyond_window_are_read_from_db(self):
+        for i in range(5):
+            Post.objects.create(
+                author=self.user, text=f'Ещё пост {i}', group=self.group
+            )
+        expected = list(self.group.posts.values_list('pk', flat=True))
+        self.assertEqual(self.feed_ids(self.group), expected)
+        self.assertEqual(GroupFeed(self.group).count(), 8)
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import comments
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class CommentIngestTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(author=self.user, text='Пост')
+        self.client.force_login(self.user)
+        self.url = reverse('posts:add_comment', args=[self.post.pk])
+
+    def tearDown(self):
+        comments.buffer.flush()
+
+    def comment(self, text='Комментарий'):
+        return self.client.post(self.url, {'text': text})
+
+    def test_post_existence_is_cached(self):
+        self.assertEqual(comments.post_stub(self.post.pk), (True, None))
+        with self.assertNumQueries(0):
+            comments.post_stub(self.post.pk)
+        self.post.delete()
+        self.assertEqual(comments.post_stub(self.post.pk), (False, None))
+
+    def test_missing_post(self):
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk + 1]),
+            {'text': 'Комментарий'},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(COMMENT_RATE='2/m')
+    def test_rate_limit(self):
+        self.comment()
+        self.comment()
+        response = self.comment()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    @override_settings(
+        COMMENT_WRITE_BEHIND=True,
+        COMMENT_BATCH_SIZE=3,
+        COMMENT_FLUSH_INTERVAL=60,
+    )
+    def test_write_behind_batches(self):
+        self.comment('Первый')
+        self.comment('Второй')
+        self.assertFalse(Comment.objects.exists())
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertContains(response, 'Первый')
+        self.assertContains(response, 'Второй')
+        with self.assertNumQueries(5):
+            # пост, автор, savepoint, INSERT, release
+            self.comment('Третий')
+        self.assertEqual(
+            list(self.post.comments.order_by('pk').values_list(
+                'text', flat=True
+            )),
+            ['Первый', 'Второй', 'Третий'],
+        )
+        self.assertEqual(
+            comments.pending_comments(self.post.pk, self.user), []
+        )
+
+    @override_settings(COMMENT_WRITE_BEHIND=True, COMMENT_FLUSH_INTERVAL=60)
+    def test_comments_on_deleted_posts_are_dropped(self):
+        other = Post.objects.create(author=self.user, text='Другой пост')
+        self.comment()
+        self.client.post(
+            reverse('posts:add_comment', args=[other.pk]), {'text': 'Тоже'}
+        )
+        other.delete()
+        self.assertEqual(comments.buffer.flush(), 1)
+        self.assertEqual(Comment.objects.get().post, self.post)
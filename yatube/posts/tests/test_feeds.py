@@ -0,0 +1,62 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from jobs.models import Job
+
+from ..feeds import count_key, feed_count
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(JOBS_ALWAYS_EAGER=False)
+class FeedCountTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(
+            title='group', slug='group', description='group'
+        )
+        Post.objects.create(author=self.author, text='Пост', group=self.group)
+        Job.objects.all().delete()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_count_is_cached(self):
+        self.assertEqual(feed_count('index'), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(feed_count('index'), 1)
+
+    def test_new_post_invalidates_counts(self):
+        for feed, pk in (('index', None), ('profile', self.author.pk),
+                         ('group', self.group.pk)):
+            self.assertEqual(feed_count(feed, pk), 1)
+        Post.objects.create(author=self.author, text='Ещё', group=self.group)
+        for feed, pk in (('index', None), ('profile', self.author.pk),
+                         ('group', self.group.pk)):
+            with self.subTest(feed=feed):
+                self.assertEqual(feed_count(feed, pk), 2)
+
+    def test_new_post_schedules_follow_counts_reset(self):
+        Post.objects.create(author=self.author, text='Ещё')
+        self.assertTrue(
+            Job.objects.filter(name='posts.invalidate_follow_counts').exists()
+        )
+
+    def test_follow_invalidates_follow_count(self):
+        self.assertEqual(feed_count('follow', self.reader.pk), 0)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(feed_count('follow', self.reader.pk), 1)
+
+    def test_stale_count_is_served_and_refreshed_in_background(self):
+        cache.set(count_key('index'), (42, time.time() - 1))
+        self.assertEqual(feed_count('index'), 42)
+        self.assertEqual(feed_count('index'), 42)
+        self.assertEqual(
+            Job.objects.filter(name='posts.refresh_feed_count').count(), 1
+        )
@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..feeds import feed_count
+from ..models import Follow, FollowCounter, Group, Post
+from ..services import follow, follow_counts, follow_group_authors, unfollow
+
+User = get_user_model()
+
+
+class FollowServiceTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='writer')
+
+    def test_follow_is_one_query_and_idempotent(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(follow(self.user, self.author))
+        with self.assertNumQueries(1):
+            self.assertFalse(follow(self.user, self.author))
+        self.assertEqual(self.user.follower.count(), 1)
+
+    def test_cannot_follow_self(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(follow(self.user, self.user))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_unfollow_is_one_query_and_idempotent(self):
+        follow(self.user, self.author)
+        with self.assertNumQueries(1):
+            self.assertTrue(unfollow(self.user, self.author))
+        with self.assertNumQueries(1):
+            self.assertFalse(unfollow(self.user, self.author))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_counters_follow_every_write(self):
+        other = User.objects.create_user(username='other')
+        follow(self.user, self.author)
+        Follow.objects.create(user=other, author=self.author)
+        self.assertEqual(follow_counts(self.author.pk), (2, 0))
+        self.assertEqual(follow_counts(self.user.pk), (0, 1))
+        unfollow(self.user, self.author)
+        self.assertEqual(follow_counts(self.author.pk), (1, 0))
+        other.delete()
+        self.assertEqual(follow_counts(self.author.pk), (0, 0))
+
+    def test_counts_without_triggers(self):
+        connection.vendor = 'oracle'
+        self.addCleanup(delattr, connection, 'vendor')
+        Follow.objects.create(user=self.user, author=self.author)
+        FollowCounter.objects.all().delete()
+        self.assertEqual(follow_counts(self.author.pk), (1, 0))
+        self.assertEqual(follow_counts(self.user.pk), (0, 1))
+
+    def test_counts_of_user_without_follows(self):
+        self.assertFalse(FollowCounter.objects.exists())
+        self.assertEqual(follow_counts(self.author.pk), (0, 0))
+
+    def test_follow_resets_follow_feed_count(self):
+        Post.objects.create(author=self.author, text='Пост')
+        self.assertEqual(feed_count('follow', self.user.pk), 0)
+        follow(self.user, self.author)
+        self.assertEqual(feed_count('follow', self.user.pk), 1)
+        unfollow(self.user, self.author)
+        self.assertEqual(feed_count('follow', self.user.pk), 0)
+
+    def test_follow_group_authors(self):
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        other = User.objects.create_user(username='other')
+        for author in (self.author, self.author, other, self.user):
+            Post.objects.create(author=author, text='Пост', group=group)
+        Post.objects.create(
+            author=User.objects.create_user(username='outsider'),
+            text='Пост без группы',
+        )
+        follow(self.user, self.author)
+        with self.assertNumQueries(1):
+            created = follow_group_authors(self.user, group)
+        self.assertEqual(created, 1)
+        self.assertEqual(
+            set(self.user.follower.values_list('author_id', flat=True)),
+            {self.author.pk, other.pk},
+        )
+        self.assertEqual(follow_counts(self.user.pk), (0, 2))
+
+    def test_group_follow_view(self):
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.create(author=self.author, text='Пост', group=group)
+        self.client.force_login(self.user)
+        url = reverse('posts:group_follow', args=[group.slug])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertFalse(Follow.objects.exists())
+        response = self.client.post(url)
+        self.assertRedirects(
+            response, reverse('posts:group_list', args=[group.slug])
+        )
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=self.author).exists()
+        )
+
+    def test_group_follow_requires_csrf(self):
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        Post.objects.create(author=self.author, text='Пост', group=group)
+        client.post(reverse('posts:group_follow', args=[group.slug]))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_group_page_button_is_personal(self):
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        url = reverse('posts:group_list', args=[group.slug])
+        button = 'Подписаться на всех авторов группы'
+        self.assertNotContains(self.client.get(url), button)
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertContains(response, button)
+        self.assertContains(response, 'csrfmiddlewaretoken')
@@ -0,0 +1,192 @@
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.test import TestCase, override_settings
+
+from ..graph import (CHANGE_KEY, EPOCH_KEY, VERSION_KEY, FollowGraph,
+                     get_graph, journal, load_graph)
+from ..models import Follow, Group
+from ..services import (follow, follow_group_authors, is_following,
+                        mutual_followers, suggested_author_ids, unfollow)
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+
+    def test_add_and_remove_are_idempotent(self):
+        graph = FollowGraph([(1, 3), (1, 2), (1, 3)])
+        self.assertEqual(list(graph.following[1]), [2, 3])
+        self.assertTrue(graph.follows(1, 2))
+        self.assertFalse(graph.follows(2, 1))
+        graph.remove(1, 2)
+        graph.remove(1, 2)
+        self.assertEqual(list(graph.following[1]), [3])
+        self.assertEqual(list(graph.followers[3]), [1])
+        self.assertNotIn(2, graph.followers)
+
+    def test_mutual_followers(self):
+        graph = FollowGraph([(1, 2), (1, 3), (1, 4), (2, 5), (3, 5), (6, 5)])
+        self.assertEqual(graph.mutual_followers(1, 5), 2)
+        self.assertEqual(graph.mutual_followers(6, 5), 0)
+
+    def test_suggestions_rank_friends_of_friends(self):
+        graph = FollowGraph([
+            (1, 2), (1, 3), (2, 4), (3, 4), (3, 5), (2, 1), (2, 3),
+        ])
+        self.assertEqual(graph.suggestions(1), [4, 5])
+        self.assertEqual(graph.suggestions(1, limit=1), [4])
+        self.assertEqual(graph.suggestions(7), [])
+
+
+class GraphSyncTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='writer')
+
+    def test_follow_checks_skip_database(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        get_graph()
+        with self.assertNumQueries(0):
+            self.assertTrue(is_following(self.user, self.author.pk))
+            self.assertFalse(is_following(self.author, self.user.pk))
+
+    def test_services_and_orm_writes_reach_graph(self):
+        graph = get_graph()
+        follow(self.user, self.author)
+        self.assertTrue(is_following(self.user, self.author.pk))
+        unfollow(self.user, self.author)
+        self.assertFalse(is_following(self.user, self.author.pk))
+        Follow.objects.create(user=self.author, author=self.user)
+        self.assertTrue(is_following(self.author, self.user.pk))
+        self.author.delete()
+        self.assertEqual(len(get_graph()), 0)
+        self.assertIs(get_graph(), graph)
+
+    def test_bulk_follow_reaches_graph(self):
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.author.posts.create(text='Пост', group=group)
+        follow_group_authors(self.user, group)
+        self.assertTrue(is_following(self.user, self.author.pk))
+
+    def test_lost_change_log_rebuilds_graph(self):
+        graph = get_graph()
+        follow(self.user, self.author)
+        # Изменение другого процесса, запись которого пропала
+        cache.incr(VERSION_KEY)
+        self.assertIsNot(get_graph(), graph)
+        self.assertTrue(is_following(self.user, self.author.pk))
+
+    def test_mutual_and_suggestions(self):
+        other = User.objects.create_user(username='other')
+        follow(self.user, self.author)
+        follow(self.author, other)
+        self.assertEqual(mutual_followers(self.user, other.pk), 1)
+        self.assertEqual(suggested_author_ids(self.user), [other.pk])
+
+    def test_graph_is_checked_once_per_request(self):
+        graph = get_graph()
+        request_started.send(sender=self.__class__)
+        try:
+            get_graph()
+            # Изменение другого процесса: только номер и запись журнала
+            cache.set(CHANGE_KEY.format(graph.version + 1),
+                      ('add', self.user.pk, self.author.pk))
+            cache.incr(VERSION_KEY)
+            self.assertFalse(is_following(self.user, self.author.pk))
+            # Свои изменения запрос видит сразу
+            follow(self.author, self.user)
+            self.assertTrue(is_following(self.author, self.user.pk))
+        finally:
+            request_finished.send(sender=self.__class__)
+        self.assertTrue(is_following(self.user, self.author.pk))
+
+    def test_lost_version_resets_graph_in_request(self):
+        get_graph()
+        request_started.send(sender=self.__class__)
+        try:
+            get_graph()
+            cache.delete(VERSION_KEY)
+            follow(self.user, self.author)
+            self.assertTrue(is_following(self.user, self.author.pk))
+        finally:
+            request_finished.send(sender=self.__class__)
+
+
+class SnapshotTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='writer')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'graph.snapshot')
+        settings = override_settings(FOLLOW_GRAPH_SNAPSHOT=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write_snapshot(self, edges):
+        epoch, version = journal()
+        graph = FollowGraph(edges, version, epoch)
+        with open(self.path, 'wb') as snapshot:
+            snapshot.write(graph.dumps())
+
+    def test_dumps_and_loads(self):
+        graph = FollowGraph([(1, 3), (1, 2), (2, 3)], version=7, epoch='e')
+        loaded = FollowGraph.loads(graph.dumps())
+        self.assertEqual(loaded.following, graph.following)
+        self.assertEqual(loaded.followers, graph.followers)
+        self.assertEqual((loaded.version, loaded.epoch), (7, 'e'))
+
+    def test_loads_rejects_other_data(self):
+        data = FollowGraph([(1, 2)]).dumps()
+        for broken in (data[:-1], b'{}\n', b'\x80\x04K\x01.'):
+            with self.assertRaises(ValueError):
+                FollowGraph.loads(broken)
+
+    def test_snapshot_skips_database(self):
+        # Снимок нарочно расходится с базой: видно, откуда взят граф
+        self.write_snapshot([(1001, 1002)])
+        with self.assertNumQueries(0):
+            graph = load_graph(*journal())
+        self.assertTrue(graph.follows(1001, 1002))
+
+    def test_snapshot_catches_up_with_log(self):
+        self.write_snapshot([(1001, 1002)])
+        follow(self.user, self.author)
+        graph = load_graph(*journal())
+        self.assertTrue(graph.follows(1001, 1002))
+        self.assertTrue(graph.follows(self.user.pk, self.author.pk))
+
+    def test_snapshot_without_log_is_ignored(self):
+        self.write_snapshot([(1001, 1002)])
+        Follow.objects.create(user=self.user, author=self.author)
+        _, version = journal()
+        cache.delete(CHANGE_KEY.format(version))
+        graph = load_graph(*journal())
+        self.assertFalse(graph.follows(1001, 1002))
+        self.assertTrue(graph.follows(self.user.pk, self.author.pk))
+
+    def test_restarted_log_ignores_snapshot(self):
+        self.write_snapshot([(1001, 1002)])
+        epoch, _ = journal()
+        cache.delete(VERSION_KEY)
+        self.assertNotEqual(journal()[0], epoch)
+        self.assertFalse(get_graph().follows(1001, 1002))
+
+    def test_broken_snapshot_falls_back_to_database(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        with open(self.path, 'wb') as snapshot:
+            snapshot.write(b'garbage')
+        with self.assertLogs('posts.graph', 'WARNING'):
+            graph = load_graph(*journal())
+        self.assertTrue(graph.follows(self.user.pk, self.author.pk))
+        self.assertEqual(cache.get(EPOCH_KEY), graph.epoch)
@@ -0,0 +1,99 @@
+import re
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+FEED_TEMPLATES = (
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/follow.html',
+    'posts/trending.html',
+)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def normalize(content):
+    """HTML без комментариев, различий в пробелах и CSRF-токенов."""
+    content = re.sub(r'<!--.*?-->', '', content.decode())
+    content = re.sub(
+        r'(name="csrfmiddlewaretoken" value=")[^"]+', r'\1', content
+    )
+    return ' '.join(re.sub(r'>\s+<', '><', content).split())
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POSTS_PER_PAGE=2)
+class Jinja2FeedTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия'
+        )
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        image = SimpleUploadedFile(
+            name='small.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        for i in range(5):
+            Post.objects.create(
+                author=self.author,
+                text=f'Пост <{i}>',
+                group=self.group,
+                image=image if i == 0 else None,
+            )
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_feeds_match_django_templates(self):
+        trending = reverse('posts:trending')
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+            trending,
+        )
+        engines = dict.fromkeys(FEED_TEMPLATES, 'jinja2')
+        for url in urls:
+            for page in (1, 3):
+                with self.subTest(url=url, page=page):
+                    cache.clear()
+                    expected = self.client.get(url, {'page': page})
+                    cache.clear()
+                    with override_settings(FEED_TEMPLATE_ENGINES=engines):
+                        response = self.client.get(url, {'page': page})
+                    self.assertEqual(
+                        normalize(response.content),
+                        normalize(expected.content),
+                    )
+                    if page == 3 and url != trending:
+                        self.assertContains(response, 'card-img')
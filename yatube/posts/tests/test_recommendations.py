@@ -0,0 +1,128 @@
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import recommendations
+from ..models import AuthorRecommendation, Follow, Post
+from ..services import recommended_authors
+
+User = get_user_model()
+
+
+def make_graph(*edges):
+    users = {}
+    for edge in edges:
+        for name in edge:
+            if name not in users:
+                users[name] = User.objects.create_user(username=name)
+    for reader, author in edges:
+        Follow.objects.create(user=users[reader], author=users[author])
+    return users
+
+
+@unittest.skipUnless(recommendations.available(), 'нужны numpy и scipy')
+class ComputeRecommendationsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.users = make_graph(
+            ('reader', 'friend'), ('reader', 'other'),
+            ('friend', 'active'), ('other', 'active'),
+            ('other', 'quiet'), ('friend', 'silent'),
+        )
+        for name in ('active', 'quiet', 'friend'):
+            Post.objects.create(author=self.users[name], text='Пост')
+        Post.objects.filter(author=self.users['quiet']).update(
+            pub_date=timezone.now() - timedelta(days=60)
+        )
+
+    def test_ranks_by_paths_and_activity(self):
+        result = recommendations.compute(k=5, half_life_days=14)
+        authors = [author_id for author_id, _ in result[
+            self.users['reader'].pk
+        ]]
+        # silent без постов не предлагается, уже прочитанные - тоже
+        self.assertEqual(
+            authors, [self.users['active'].pk, self.users['quiet'].pk]
+        )
+
+    def test_top_k_limits_each_reader(self):
+        result = recommendations.compute(k=1, half_life_days=14)
+        self.assertEqual(
+            result[self.users['reader'].pk][0][0], self.users['active'].pk
+        )
+        self.assertTrue(all(len(authors) == 1 for authors in result.values()))
+
+    def test_chunks_match_whole_matrix(self):
+        now = timezone.now()
+        chunked = recommendations.compute(5, 14, now, chunk_size=1)
+        whole = recommendations.compute(5, 14, now)
+        self.assertEqual(chunked.keys(), whole.keys())
+        for user_id, authors in whole.items():
+            self.assertEqual(
+                [author_id for author_id, _ in chunked[user_id]],
+                [author_id for author_id, _ in authors],
+            )
+            for (_, first), (_, second) in zip(chunked[user_id], authors):
+                self.assertAlmostEqual(first, second)
+
+    def test_rare_shared_author_counts_more(self):
+        users = make_graph(
+            ('niche', 'rare'), ('niche', 'a'), ('fan', 'star'),
+            ('fan', 'b'), ('x', 'star'), ('y', 'star'), ('z', 'star'),
+            ('probe', 'rare'), ('probe', 'star'),
+        )
+        for name in ('a', 'b'):
+            Post.objects.create(author=users[name], text='Пост')
+        result = dict(recommendations.compute(
+            k=5, half_life_days=14
+        )[users['probe'].pk])
+        # Общий редкий автор ведёт к a сильнее, чем популярный - к b
+        self.assertGreater(result[users['a'].pk], result[users['b'].pk])
+
+    def test_command_replaces_table(self):
+        AuthorRecommendation.objects.create(
+            user=self.users['reader'], author=self.users['silent'], score=9
+        )
+        call_command('compute_recommendations', stdout=StringIO())
+        self.assertEqual(
+            list(self.users['reader'].recommendations.values_list(
+                'author__username', flat=True
+            )),
+            ['active', 'quiet'],
+        )
+
+
+class RecommendedAuthorsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.users = make_graph(('reader', 'friend'), ('friend', 'writer'))
+
+    def test_stored_recommendations_skip_followed(self):
+        reader = self.users['reader']
+        for score, name in enumerate(('writer', 'friend')):
+            AuthorRecommendation.objects.create(
+                user=reader, author=self.users[name], score=score
+            )
+        self.assertEqual(recommended_authors(reader), [self.users['writer']])
+
+    def test_falls_back_to_graph(self):
+        self.assertEqual(
+            recommended_authors(self.users['reader']), [self.users['writer']]
+        )
+
+    def test_shown_on_follow_page(self):
+        self.client.force_login(self.users['reader'])
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Кого почитать')
+        self.assertContains(
+            response, reverse('posts:profile', args=['writer'])
+        )
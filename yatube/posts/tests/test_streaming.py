@@ -0,0 +1,95 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+FEED_TEMPLATES = [
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/follow.html',
+]
+
+
+def without_csrf(content):
+    """Токен CSRF маскируется заново при каждой отрисовке."""
+    return re.sub(
+        rb'(name="csrfmiddlewaretoken" value=")[^"]+', rb'\1', content
+    )
+
+
+@override_settings(POSTS_PER_PAGE=3)
+class StreamingFeedTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for i in range(5):
+            Post.objects.create(
+                author=self.author, text=f'Пост {i}', group=self.group
+            )
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, url, **settings):
+        cache.clear()
+        with override_settings(**settings):
+            return self.client.get(url)
+
+    def test_streamed_feeds_match_rendered(self):
+        for engine in ('django', 'jinja2'):
+            engines = dict.fromkeys(FEED_TEMPLATES, engine)
+            for url in self.urls:
+                with self.subTest(engine=engine, url=url):
+                    expected = self.get(url, FEED_TEMPLATE_ENGINES=engines)
+                    response = self.get(
+                        url,
+                        FEED_TEMPLATE_ENGINES=engines,
+                        STREAMING_FEED_TEMPLATES=FEED_TEMPLATES,
+                    )
+                    self.assertTrue(response.streaming)
+                    self.assertEqual(
+                        without_csrf(b''.join(response.streaming_content)),
+                        without_csrf(expected.content),
+                    )
+
+    def test_page_text_cannot_split_page(self):
+        # Описание группы рисуется вне {% stream %}, вместе с метками
+        self.group.description = 'до\x00<!-- stream -->после'
+        self.group.save()
+        url = reverse('posts:group_list', args=(self.group.slug,))
+        expected = self.get(url)
+        response = self.get(url, STREAMING_FEED_TEMPLATES=FEED_TEMPLATES)
+        self.assertEqual(
+            without_csrf(b''.join(response.streaming_content)),
+            without_csrf(expected.content),
+        )
+
+    def test_chrome_is_sent_before_posts(self):
+        response = self.get(
+            reverse('posts:index'), STREAMING_FEED_TEMPLATES=FEED_TEMPLATES
+        )
+        chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 4)
+        self.assertIn(b'<header>', chunks[0])
+        self.assertNotIn('Пост'.encode(), chunks[0])
+        self.assertIn('Пост 4'.encode(), chunks[1])
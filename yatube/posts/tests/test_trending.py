@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import trending
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+HOUR = 60 * 60
+
+
+@override_settings(TRENDING_HALF_LIFE=HOUR, TRENDING_CAPACITY=2)
+class DecayedScoresTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_recent_events_outweigh_old_ones(self):
+        trending.record('post', 1, 3, now=1000)
+        trending.record('post', 2, 2, now=1000 + 2 * HOUR)
+        ranking = trending.top('post', 2, now=1000 + 2 * HOUR)
+        self.assertEqual([pk for pk, _ in ranking], [2, 1])
+        self.assertAlmostEqual(ranking[0][1], 2)
+        self.assertAlmostEqual(ranking[1][1], 0.75)
+
+    def test_rescaling_keeps_scores(self):
+        trending.record('post', 1, 1, now=1000)
+        later = 1000 + (trending.RESCALE_AFTER + 1) * HOUR
+        trending.record('post', 2, 1, now=later)
+        ranking = dict(trending.top('post', 2, now=later))
+        self.assertAlmostEqual(ranking[2], 1)
+        self.assertAlmostEqual(
+            ranking[1], 2 ** -(trending.RESCALE_AFTER + 1)
+        )
+
+    def test_only_best_candidates_are_kept(self):
+        for pk in range(1, 6):
+            trending.record('post', pk, pk, now=1000)
+        state = cache.get(trending.TRENDING_KEY.format('post'))
+        self.assertEqual(set(state['scores']), {4, 5})
+        self.assertEqual(
+            [pk for pk, _ in trending.top('post', 3, now=1000)], [5, 4]
+        )
+
+
+class TrendingViewsTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='author')
+        self.quiet_group = Group.objects.create(
+            title='Тихая', slug='quiet', description='Описание'
+        )
+        self.busy_group = Group.objects.create(
+            title='Шумная', slug='busy', description='Описание'
+        )
+        self.quiet = Post.objects.create(
+            author=self.user, text='Тихий пост', group=self.quiet_group
+        )
+        self.busy = Post.objects.create(
+            author=self.user, text='Обсуждаемый пост', group=self.busy_group
+        )
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.client.post(
+                reverse('posts:add_comment', args=[self.busy.pk]),
+                {'text': 'Комментарий'},
+            )
+
+    def test_comments_raise_post_and_group(self):
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertEqual(
+            trending.trending_posts(2), [self.busy, self.quiet]
+        )
+        self.assertEqual(
+            trending.trending_groups(2), [self.busy_group, self.quiet_group]
+        )
+
+    def test_trending_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(
+            list(response.context['posts']), [self.busy, self.quiet]
+        )
+        self.assertContains(response, 'Популярные группы')
+
+    def test_index_sidebar(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            response.context['trending_groups'],
+            [self.busy_group, self.quiet_group],
+        )
+
+    def test_deleted_post_leaves_trending(self):
+        self.busy.delete()
+        self.assertEqual(trending.trending_posts(2), [self.quiet])
@@ -1,3 +1,4 @@
+import gzip
 import shutil
 import tempfile
 
@@ -162,6 +163,53 @@ class PostsURLTests(TestCase):
         response = self.guest_client.get(reverse('posts:index'))
         self.assertNotIn(self.post1.text.encode('utf-8'), response.content)
 
+    def test_cache_page_stores_compressed_page(self):
+        url = reverse('posts:index')
+        response = self.guest_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(
+            self.post1.text.encode('utf-8'), gzip.decompress(response.content)
+        )
+        with self.assertNumQueries(0):
+            cached = self.guest_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(cached.content, response.content)
+        plain = self.guest_client.get(url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_cached_index_is_shared_by_all_users(self):
+        url = reverse('posts:index')
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Войти')
+        self.post1.delete()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, self.post1.text)
+        self.assertContains(response, f'Пользователь: {self.user1.username}')
+        self.assertContains(response, 'Избранные авторы')
+        self.assertNotContains(response, 'Войти')
+        response = self.guest_client.get(url)
+        self.assertContains(response, 'Войти')
+        self.assertNotContains(response, 'Избранные авторы')
+
+    def test_profile_follow_button(self):
+        url = reverse('posts:profile', args=(self.user2.username,))
+        follow_url = reverse(
+            'posts:profile_follow', args=(self.user2.username,)
+        )
+        unfollow_url = reverse(
+            'posts:profile_unfollow', args=(self.user2.username,)
+        )
+        response = self.authorized_client.get(url)
+        self.assertContains(response, follow_url)
+        Follow.objects.create(user=self.user1, author=self.user2)
+        response = self.authorized_client.get(url)
+        self.assertContains(response, unfollow_url)
+
+    def test_edit_link_is_shown_to_author_only(self):
+        url = reverse('posts:post_detail', args=(self.post1.pk,))
+        edit_url = reverse('posts:post_edit', args=(self.post1.pk,))
+        self.assertContains(self.authorized_client.get(url), edit_url)
+        self.assertNotContains(self.guest_client.get(url), edit_url)
+
     def test_auth_user_follow(self):
         follow_count = Follow.objects.count()
         self.authorized_client.get(
@@ -241,6 +289,17 @@ class PaginatorViewsTest(TestCase):
                 author=self.user1, group=self.group) for _ in range(13)
         ]
 
+    @override_settings(POSTS_PER_PAGE=1)
+    def test_page_links_are_windowed(self):
+        response = self.authorized_client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug})
+            + '?page=7'
+        )
+        content = response.content.decode()
+        self.assertEqual(content.count('class="page-item'), 13)
+        self.assertIn('?page=13"', content)
+        self.assertNotIn('?page=3"', content)
+
     def test_first_index_page_ten_records(self):
         response = self.authorized_client.get(reverse('posts:index'))
         self.assertEqual(
@@ -0,0 +1,98 @@
+import heapq
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Group, Post
+
+# Оценки популярности по видам: 'post' и 'group'
+TRENDING_KEY = 'trending:{}'
+# Через сколько периодов полураспада точка отсчёта сдвигается, чтобы
+# множители 2 ** (возраст / период) не росли без предела
+RESCALE_AFTER = 32
+
+
+def _load(kind, now):
+    return cache.get(TRENDING_KEY.format(kind)) or {
+        'landmark': now,
+        'scores': {},
+    }
+
+
+def _save(kind, state):
+    cache.set(TRENDING_KEY.format(kind), state, None)
+
+
+def record(kind, item_id, weight, now=None):
+    """Добавляет событие с весом weight к оценке item_id.
+
+    Оценки затухают вдвое каждые TRENDING_HALF_LIFE секунд. Затухание
+    прямое: вес нового события умножается на 2 ** (t / период) от
+    точки отсчёта, поэтому старые оценки не пересчитываются, а
+    порядок по хранимым числам - это порядок по текущей популярности.
+    Хранятся только TRENDING_CAPACITY лучших, так что чтение не
+    обращается к базе. Одновременные записи из разных процессов
+    изредка теряют событие: для популярности это допустимо.
+    """
+    now = now or time.time()
+    half_life = settings.TRENDING_HALF_LIFE
+    state = _load(kind, now)
+    age = now - state['landmark']
+    if age > RESCALE_AFTER * half_life:
+        factor = 2 ** (-age / half_life)
+        state['scores'] = {
+            pk: score * factor for pk, score in state['scores'].items()
+        }
+        state['landmark'] = now
+        age = 0
+    scores = state['scores']
+    scores[item_id] = scores.get(item_id, 0) + weight * 2 ** (age / half_life)
+    capacity = settings.TRENDING_CAPACITY
+    if len(scores) > 2 * capacity:
+        state['scores'] = dict(
+            heapq.nlargest(capacity, scores.items(), key=lambda item: item[1])
+        )
+    _save(kind, state)
+
+
+def top(kind, k, now=None):
+    """k самых популярных: [(id, оценка на текущий момент)]."""
+    now = now or time.time()
+    state = _load(kind, now)
+    factor = 2 ** (
+        -(now - state['landmark']) / settings.TRENDING_HALF_LIFE
+    )
+    best = heapq.nlargest(
+        k, state['scores'].items(), key=lambda item: item[1]
+    )
+    return [(pk, score * factor) for pk, score in best]
+
+
+def forget(kind, item_id):
+    state = cache.get(TRENDING_KEY.format(kind))
+    if state is not None and state['scores'].pop(item_id, None) is not None:
+        _save(kind, state)
+
+
+def record_activity(event, post_id, group_id):
+    """Учитывает новый пост или комментарий (event) в популярности."""
+    weight = settings.TRENDING_WEIGHTS[event]
+    record('post', post_id, weight)
+    if group_id is not None:
+        record('group', group_id, weight)
+
+
+def _objects(queryset, ids):
+    by_id = queryset.in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def trending_posts(limit):
+    ids = [pk for pk, _ in top('post', limit)]
+    return _objects(Post.objects.select_related('author', 'group'), ids)
+
+
+def trending_groups(limit):
+    ids = [pk for pk, _ in top('group', limit)]
+    return _objects(Group.objects.all(), ids)
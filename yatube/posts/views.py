@@ -1,73 +1,118 @@
+from functools import partial
+
+from core.decorators import compress_page
+from core.paginator import CountedPaginator
+from core.ratelimit import take_token
+from core.streaming import stream_template
+from core.views import too_many_requests
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.cache import cache_page
+from django.views.decorators.http import require_POST
+from jobs.queue import enqueue
 
+from . import comments
+from .cache import GroupFeed, get_group
+from .feeds import feed_count
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Post, User
+from .services import (follow, follow_counts, follow_group_authors,
+                       unfollow)
+from .trending import trending_groups, trending_posts
+
+
+def enqueue_side_effects(post):
+    if post.image:
+        enqueue(
+            'posts.warm_thumbnail',
+            {'post_id': post.pk},
+            key=f'thumbnail:{post.pk}:{post.image.name}',
+        )
 
 
-def pagination(request, post_list):
-    paginator = Paginator(
-        post_list, settings.POSTS_PER_PAGE
+def pagination(request, post_list, count=None):
+    paginator = CountedPaginator(
+        post_list, settings.POSTS_PER_PAGE, count_func=count
     )
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def render_feed(request, template_name, context):
+    """render() движком, выбранным для шаблона в FEED_TEMPLATE_ENGINES.
+
+    Шаблоны из STREAMING_FEED_TEMPLATES отправляются потоком.
+    """
+    using = settings.FEED_TEMPLATE_ENGINES.get(template_name)
+    if template_name in settings.STREAMING_FEED_TEMPLATES:
+        return stream_template(request, template_name, context, using=using)
+    return render(request, template_name, context, using=using)
+
+
 @cache_page(20, key_prefix='index_page')
+@compress_page
 def index(request):
     post_list = Post.objects.all()
-    page_obj = pagination(request, post_list)
+    page_obj = pagination(
+        request, post_list, count=partial(feed_count, 'index')
+    )
     context = {
         'page_obj': page_obj,
+        'trending_groups': trending_groups(settings.TRENDING_GROUPS_SHOWN),
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'posts/index.html', context)
+
+
+def trending(request):
+    context = {
+        'posts': trending_posts(settings.POSTS_PER_PAGE),
+        'trending_groups': trending_groups(settings.TRENDING_GROUPS_SHOWN),
+    }
+    return render_feed(request, 'posts/trending.html', context)
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    page_obj = pagination(request, post_list)
+    group = get_group(slug)
+    page_obj = pagination(request, GroupFeed(group))
     context = {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
+    return render_feed(request, 'posts/group_list.html', context)
 
 
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     post_list = author.posts.all()
-    post_num = author.posts.all().count()
-    page_obj = pagination(request, post_list)
-    following = (
-        request.user.is_authenticated
-        and Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
+    page_obj = pagination(
+        request, post_list, count=partial(feed_count, 'profile', author.pk)
     )
+    post_num = page_obj.paginator.count
+    followers, following = follow_counts(author.pk)
     context = {
         'author': author,
         'page_obj': page_obj,
         'post_num': post_num,
+        'followers': followers,
         'following': following,
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    post_num = post.author.posts.all().count()
+    post_num = feed_count('profile', post.author_id)
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
     context = {
         'post': post,
         'post_num': post_num,
         'form': form,
-        'comments': comments,
+        'comments': [
+            *post.comments.all(),
+            *comments.pending_comments(post.pk, request.user),
+        ],
     }
     return render(request, 'posts/post_detail.html', context)
 
@@ -82,6 +127,7 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        enqueue_side_effects(post)
         return redirect('posts:profile', username=request.user)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -103,50 +149,59 @@ def post_edit(request, post_id):
     }
     if form.is_valid():
         form.save()
+        enqueue_side_effects(post)
         return redirect('posts:post_detail', post_id=post.id)
     return render(request, 'posts/create_post.html', context)
 
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    exists, group_id = comments.post_stub(post_id)
+    if not exists:
+        raise Http404
     form = CommentForm(request.POST or None)
     if form.is_valid():
+        retry_after = take_token(
+            f'comment:{request.user.pk}', settings.COMMENT_RATE
+        )
+        if retry_after:
+            return too_many_requests(request, retry_after)
         comment = form.save(commit=False)
         comment.author = request.user
-        comment.post = post
-        comment.save()
+        comment.post_id = post_id
+        comments.add_comment(comment, group_id)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
     posts = Post.objects.filter(author__following__user=request.user).all()
-    page_obj = pagination(request, posts.all())
+    page_obj = pagination(
+        request, posts, count=partial(feed_count, 'follow', request.user.pk)
+    )
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    user = request.user
-    if user != author:
-        Follow.objects.get_or_create(
-            user=user,
-            author=author
-        )
+    follow(request.user, author)
     return redirect('posts:profile', username)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    user = request.user
-    Follow.objects.get(
-        user=user,
-        author=author
-    ).delete()
+    unfollow(request.user, author)
     return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def group_follow(request, slug):
+    group = get_group(slug)
+    follow_group_authors(request.user, group)
+    return redirect('posts:group_list', slug)
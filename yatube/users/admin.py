@@ -1,3 +1,25 @@
-# from django.contrib import admin
+from core.paginator import EstimatedCountPaginator
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
 
-# Register your models here.
+User = get_user_model()
+
+
+class IndexedUserAdmin(UserAdmin):
+    # Автодополнение авторов в админке постов ищет по префиксу
+    # уникального (а значит, индексированного) username; в списке
+    # пользователей остаётся обычный поиск UserAdmin
+    autocomplete_search_fields = ('^username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_fields(self, request):
+        match = request.resolver_match
+        if match and match.url_name.endswith('_autocomplete'):
+            return self.autocomplete_search_fields
+        return super().get_search_fields(request)
+
+
+admin.site.unregister(User)
+admin.site.register(User, IndexedUserAdmin)
@@ -0,0 +1,363 @@
+import os
+from importlib.util import find_spec
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Общие настройки всех профилей (yatube/settings/__init__.py).
+# Профили dev, test и prod меняют только то, чем окружения отличаются.
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'qm@q+^w*yy!_npzl6gn%jl7vdc#l#quiw!rqp1yw%392k7*wxj'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.lzrdou.pythonanywhere.com',
+    'lzrdou.pythonanywhere.com',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
+    'jobs.apps.JobsConfig',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.PrimaryPinningMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.ThrottleMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.PhasedRenderMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+    {
+        # Необязательный движок для горячих шаблонов лент,
+        # включается для отдельных шаблонов в FEED_TEMPLATE_ENGINES
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'NAME': 'jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'core.jinja2.environment',
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+# Шаблоны, чей текст подставляется на место {% include %} при компиляции
+TEMPLATE_INLINE_INCLUDES = [
+    'posts/includes/post_list.html',
+    'posts/includes/paginator.html',
+]
+
+# Шаблон ленты -> имя движка из TEMPLATES, например
+# {'posts/index.html': 'jinja2'}. По умолчанию всё рисует Django.
+FEED_TEMPLATE_ENGINES = {}
+
+# Шаблоны лент, которые отправляются потоком: шапка сразу, карточки
+# постов по мере отрисовки. Потоковые ответы не попадают в кеш
+# страниц, поэтому главной (cache_page) это обычно не нужно.
+STREAMING_FEED_TEMPLATES = []
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+# Соединения живут DB_CONN_MAX_AGE секунд и проверяются перед
+# повторным использованием. DB_POOL_SIZE включает пул соединений воркера.
+DB_CONNECTION = {
+    'ENGINE': 'core.db.backends.sqlite3',
+    'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+    'CONN_HEALTH_CHECKS': True,
+}
+if os.environ.get('DB_POOL_SIZE'):
+    DB_CONNECTION['POOL'] = {
+        'MAX_SIZE': int(os.environ['DB_POOL_SIZE']),
+        'TIMEOUT': 5,
+        'MAX_AGE': 300,
+    }
+
+DATABASES = {
+    'default': {
+        **DB_CONNECTION,
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# Реплики только для чтения: пути к файлам SQLite через запятую,
+# например DB_REPLICAS=/var/lib/yatube/replica1.sqlite3
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DB_CONNECTION,
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# Сколько секунд после записи запросы автора читают из основной базы
+REPLICA_PIN_SECONDS = 5
+
+
+# Хранилище сессий (переменная окружения SESSION_STORE):
+# cached_db - кеш поверх базы, в базу пишутся только изменения;
+# cache - только кеш (нужен общий кеш вроде memcached или redis);
+# signed_cookies - данные сессии в подписанной куке, без хранилища.
+SESSION_ENGINES = {
+    'cached_db': 'core.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_STORE', 'cached_db')]
+
+# Хеширование паролей (переменная окружения PASSWORD_HASHER): первым
+# идёт хешер новых паролей, остальные проверяют старые хеши, которые
+# при входе пересчитываются первым. Сравнение - manage.py bench_hashers.
+# По умолчанию argon2, если установлен argon2-cffi, иначе scrypt.
+PASSWORD_HASHER_CHOICES = {
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get(
+    'PASSWORD_HASHER', 'argon2' if find_spec('argon2') else 'scrypt'
+)
+PASSWORD_HASHERS = list(dict.fromkeys([
+    PASSWORD_HASHER_CHOICES[PASSWORD_HASHER],
+    *PASSWORD_HASHER_CHOICES.values(),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]))
+PASSWORD_SCRYPT = {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1}
+PASSWORD_ARGON2 = {'time_cost': 2, 'memory_cost': 19 * 1024, 'parallelism': 1}
+# Потоков для вычисления хешей на процесс; None - в потоке запроса
+PASSWORD_HASHING_THREADS = None
+
+# Сколько секунд request.user берётся из кеша (core.auth)
+USER_CACHE_TIMEOUT = 60 * 60
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'Ru-ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# manage.py collectstatic собирает сюда статику с хешами в именах и
+# сжатыми вариантами, их отдаёт core.middleware.StaticFilesMiddleware
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+
+
+# Письма складываются в очередь в базе, а отправляет их задача
+# jobs.send_queued_email через EMAIL_QUEUE_BACKEND пачками по
+# EMAIL_BATCH_SIZE в одном соединении: запрос не ждёт почтовый сервер.
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_TIMEOUT = 10
+EMAIL_BATCH_SIZE = 100
+# Через сколько секунд захваченное упавшим воркером письмо снова
+# готово. Захват продлевается перед каждым письмом, поэтому срок должен
+# быть больше отправки одного письма (несколько EMAIL_TIMEOUT).
+EMAIL_SEND_TIMEOUT = 300
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_DELAY = 60
+EMAIL_QUEUE_FLUSH_TIMEOUT = 60
+
+POSTS_PER_PAGE = 10
+
+# Кеш групп: slug -> группа и id первых постов ленты каждой группы
+GROUP_CACHE_TIMEOUT = 60 * 60
+GROUP_FEED_CACHE_SIZE = POSTS_PER_PAGE * 10
+
+# Сколько секунд число постов ленты считается свежим. Устаревшее
+# значение отдаётся ещё FEED_COUNT_STALE_FACTOR раз по столько же,
+# пока фоновая задача пересчитывает его.
+FEED_COUNT_TTL = {
+    'index': 60,
+    'group': 300,
+    'profile': 300,
+    'follow': 30,
+}
+FEED_COUNT_STALE_FACTOR = 10
+
+# Граф подписок в памяти каждого процесса (posts.graph). Снимок
+# графа ускоряет запуск: он пишется командой follow_graph_snapshot
+# и загружается, пока журнал изменений хранит всё, что было после
+# него (FOLLOW_GRAPH_LOG_TIMEOUT).
+FOLLOW_GRAPH_SNAPSHOT = os.environ.get('FOLLOW_GRAPH_SNAPSHOT')
+# Сколько секунд хранится журнал изменений графа для других процессов
+FOLLOW_GRAPH_LOG_TIMEOUT = 60 * 60
+
+# Рекомендации авторов (команда compute_recommendations): сколько
+# хранить на читателя, сколько показывать, за сколько дней вес
+# поста в активности автора падает вдвое и сколько читателей
+# оценивать за раз (память расчёта растёт с этим числом)
+RECOMMENDATIONS_PER_USER = 20
+RECOMMENDATIONS_SHOWN = 5
+RECOMMENDATIONS_HALF_LIFE_DAYS = 14
+RECOMMENDATIONS_CHUNK_SIZE = 1000
+
+# Популярное (posts.trending): вес события, период полураспада оценок
+# в секундах, сколько кандидатов хранить и сколько групп показывать
+TRENDING_WEIGHTS = {
+    'post': 1.0,
+    'comment': 2.0,
+}
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_CAPACITY = 100
+TRENDING_GROUPS_SHOWN = 5
+
+# Комментарии (posts.comments): не чаще COMMENT_RATE на пользователя.
+# При COMMENT_WRITE_BEHIND они пишутся в базу пачками по
+# COMMENT_BATCH_SIZE, но не позже чем через COMMENT_FLUSH_INTERVAL
+# секунд, а автор до того видит свой комментарий из кеша.
+COMMENT_RATE = '10/m'
+COMMENT_WRITE_BEHIND = True
+COMMENT_BATCH_SIZE = 50
+COMMENT_FLUSH_INTERVAL = 2
+COMMENT_PENDING_TIMEOUT = 60
+# Сколько секунд помнить, есть ли пост и в какой он группе
+POST_STUB_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Лимиты запросов (core.middleware.ThrottleMiddleware) по имени адреса:
+# 'user' - для вошедших пользователей, 'ip' - для анонимов.
+# Считаются все запросы к адресу, включая показ формы.
+THROTTLE_RATES = {
+    'posts:post_create': {'user': '30/m'},
+    'posts:add_comment': {'user': '30/m'},
+    'posts:profile_follow': {'user': '60/m'},
+    'posts:group_follow': {'user': '10/m'},
+    'users:signup': {'ip': '20/h'},
+    'users:login': {'ip': '30/m'},
+    'users:password_reset': {'ip': '10/h'},
+}
+# Откуда брать адрес клиента: за обратным прокси, например,
+# HTTP_X_FORWARDED_FOR. Заголовку можно верить, только если прокси
+# перезаписывает его, а не дописывает к присланному клиентом.
+THROTTLE_IP_HEADER = 'REMOTE_ADDR'
+
+# Фоновые задачи: воркеры запускаются командой manage.py run_jobs.
+# При JOBS_ALWAYS_EAGER задачи выполняются сразу после коммита
+# транзакции, без воркеров.
+JOBS_ALWAYS_EAGER = False
+JOBS_POLL_INTERVAL = 1
+JOBS_RETRY_DELAY = 10
+JOBS_VISIBILITY_TIMEOUT = 300
+# Сколько секунд хранить выполненные задачи с ключом идемпотентности
+# и как часто воркер в простое удаляет более старые
+JOBS_DONE_RETENTION = 7 * 24 * 60 * 60
+JOBS_PURGE_INTERVAL = 60 * 60
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Кеш своего процесса. Лимиты запросов, журнал графа подписок и
+# ждущие записи комментарии должны быть общими для всех воркеров,
+# поэтому в боевом профиле кеш внешний.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
@@ -0,0 +1,26 @@
+from importlib.util import find_spec
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+# Профиль разработки: manage.py runserver на своей машине.
+
+DEBUG = True
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+# Письма складываются в sent_emails/, задачи и письма выполняются
+# сразу, без воркеров, а комментарии сразу видны в базе
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+JOBS_ALWAYS_EAGER = True
+COMMENT_WRITE_BEHIND = False
+
+# Панель отладки, если установлена. Копии списков - чтобы не менять
+# общие с другими профилями списки из base
+if find_spec('debug_toolbar'):
+    INSTALLED_APPS = [*INSTALLED_APPS, 'debug_toolbar']
+    MIDDLEWARE = [
+        *MIDDLEWARE, 'debug_toolbar.middleware.DebugToolbarMiddleware'
+    ]
@@ -0,0 +1,46 @@
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, TEMPLATE_INLINE_INCLUDES, TEMPLATES
+
+# Боевой профиль. Проверка настроек на производительность:
+# DJANGO_ENV=prod manage.py check --deploy --tag performance
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Задайте DJANGO_SECRET_KEY.')
+
+ALLOWED_HOSTS = list(filter(
+    None, os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',')
+)) or ALLOWED_HOSTS
+
+# Шаблоны компилируются один раз на процесс
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        ('core.template.loaders.InliningLoader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ], TEMPLATE_INLINE_INCLUDES),
+    ]),
+]
+
+# Статика с хешами в именах и заранее сжатыми вариантами
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Общий для всех воркеров memcached: адреса через запятую. Клиент
+# pylibmc ставится из requirements-prod.txt
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyLibMCCache',
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION', '127.0.0.1:11211'
+        ).split(','),
+    }
+}
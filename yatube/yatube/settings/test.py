@@ -0,0 +1,12 @@
+from .base import *  # noqa: F401,F403
+
+# Профиль тестов: manage.py test и pytest. Всё выполняется в процессе
+# теста, без воркеров и внешних сервисов.
+
+JOBS_ALWAYS_EAGER = True
+COMMENT_WRITE_BEHIND = False
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Быстрый хешер для паролей тестовых пользователей; хешеры проверяются
+# в core.tests.test_hashers со своими настройками
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
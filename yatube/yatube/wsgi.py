@@ -1,6 +1,10 @@
 import os
 
-from django.core.wsgi import get_wsgi_application
+# Django 2.2 импортирует distutils, а подмена из setuptools тянет за
+# собой pkg_resources: со стандартным distutils запуск на ~0.2 с быстрее
+os.environ.setdefault('SETUPTOOLS_USE_DISTUTILS', 'stdlib')
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 